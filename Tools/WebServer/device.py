@@ -11,7 +11,7 @@ Supports multi-device operations.
 
 import datetime
 
-from serial_utils import serial_write, serial_write_async
+from serial_utils import serial_write, serial_write_latest
 
 
 def map_value(value, in_min, in_max, out_min, out_max):
@@ -53,7 +53,9 @@ def set_motor_value(
     command = f"{cmd_str}\r\n"
 
     if async_mode:
-        serial_write_async(device, command)
+        # Fire-and-forget setpoints: a newer value for the same motor
+        # replaces one that has not been written yet
+        serial_write_latest(device, ("motor", int(motor_id or 0)), command)
         return None, None
     else:
         if device.ser is None:
@@ -223,11 +225,17 @@ def show_battery_usage(device, motor_id=None):
     return serial_write(device, command)
 
 
+def clock_set_command(now):
+    """Build the command that sets the device clock to a datetime."""
+    return (
+        f"clock -c SET -y {now.year} -m {now.month} -d {now.day}"
+        f" -H {now.hour} -M {now.minute} -S {now.second}\r\n"
+    )
+
+
 def config_clock(device):
     """Set device clock to current system time."""
     if device.ser is None:
         return None, "Serial port not opened"
 
-    now = datetime.datetime.now()
-    command = f"clock -c SET -y {now.year} -m {now.month} -d {now.day} -H {now.hour} -M {now.minute} -S {now.second}\r\n"
-    return serial_write(device, command)
+    return serial_write(device, clock_set_command(datetime.datetime.now()))
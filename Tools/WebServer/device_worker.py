@@ -9,25 +9,200 @@ Per-device worker thread manager for DutyCycle Web Server.
 Each device has its own worker thread for serial I/O and monitoring.
 """
 
-import datetime
+import codecs
+import collections
 import logging
-import queue
+import os
+import selectors
+import sys
 import threading
 import time
 
 from timer import TimerManager
 
 
+class SelectorWaker:
+    """Event-like worker wake-up that also fires when the serial port has data.
+
+    The worker blocks in a selector on a self-pipe and the serial port's file
+    descriptor, so incoming bytes wake it immediately instead of waiting for
+    the next timer tick. Linux only (serial fds are not selectable on Windows,
+    and macOS kqueue/poll do not support tty devices reliably).
+    """
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._read_fd, self._write_fd = os.pipe()
+        os.set_blocking(self._read_fd, False)
+        os.set_blocking(self._write_fd, False)
+        self._selector.register(self._read_fd, selectors.EVENT_READ)
+        self._serial = None
+        self._serial_fd = None
+        self._suspended = None
+        self.serial_ready = False  # Last wait() returned because of serial data
+
+    def set(self):
+        """Wake the waiting worker."""
+        try:
+            os.write(self._write_fd, b"x")
+        except OSError:
+            pass  # Pipe full (a wake-up is already pending) or closed
+
+    def clear(self):
+        """Consume pending wake-ups."""
+        try:
+            while os.read(self._read_fd, 4096):
+                pass
+        except OSError:
+            pass
+
+    def watch(self, ser):
+        """Also wake when ser (a pyserial port, or None) becomes readable."""
+        fd = None
+        if ser is not None:
+            try:
+                fd = ser.fileno()
+            except (AttributeError, OSError, ValueError):
+                fd = None
+            if not isinstance(fd, int):
+                fd = None
+        if ser is self._serial and fd == self._serial_fd:
+            return
+        if ser is not None and ser is self._suspended:
+            return
+
+        if self._serial_fd is not None:
+            try:
+                self._selector.unregister(self._serial_fd)
+            except (KeyError, ValueError):
+                pass
+        self._serial, self._serial_fd = ser, None
+        if fd is not None:
+            try:
+                self._selector.register(fd, selectors.EVENT_READ)
+                self._serial_fd = fd
+            except (KeyError, ValueError, OSError):
+                pass
+
+    def suspend(self, ser):
+        """Stop watching ser, e.g. a hung-up port that stays readable.
+
+        The worker falls back to timer-driven polling for it; a newly opened
+        port object is watched again.
+        """
+        self.watch(None)
+        self._suspended = ser
+
+    def wait(self, timeout=None):
+        """Block until set(), serial data or timeout. Returns True if woken."""
+        self.serial_ready = False
+        try:
+            events = self._selector.select(timeout)
+        except (OSError, ValueError):
+            # The serial fd went away under us; stop watching it
+            self.watch(None)
+            return False
+        serial_fd = self._serial_fd
+        self.serial_ready = any(key.fd == serial_fd for key, _ in events)
+        return bool(events)
+
+    def close(self):
+        """Release the selector and pipe."""
+        self._selector.close()
+        os.close(self._read_fd)
+        os.close(self._write_fd)
+
+
+class LockWaker:
+    """Event-like worker wake-up built on a bare lock.
+
+    threading.Event.wait() goes through a Condition and allocates a waiter
+    lock per call; here the lock itself is the flag (released = set), so a
+    wait is a single timed acquire. Used where SelectorWaker is unavailable.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lock.acquire()
+
+    def set(self):
+        """Wake the waiting worker."""
+        try:
+            self._lock.release()
+        except RuntimeError:
+            pass  # Already set
+
+    def clear(self):
+        """Consume a pending wake-up."""
+        self._lock.acquire(False)
+
+    def wait(self, timeout=None):
+        """Wait until set() or timeout; returns True if woken by set()."""
+        if self._lock.acquire(True, -1 if timeout is None else timeout):
+            # Stay set until clear(), like threading.Event
+            self._lock.release()
+            return True
+        return False
+
+
+_utf8_decoder = codecs.getincrementaldecoder("utf-8")
+
+# Per-thread completion Event reused by enqueue_and_wait() calls
+_wait_local = threading.local()
+
+# (whole second, "HH:MM:SS.") of the last log timestamp; swapped as one tuple
+# so workers on other threads never see a mismatched pair
+_timestamp_cache = (None, "")
+
+
+def _log_timestamp():
+    """Format the current local time as HH:MM:SS.mmm for serial log entries."""
+    global _timestamp_cache
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _timestamp_cache
+    if second != cached_second:
+        # Only format the clock part once per second
+        prefix = time.strftime("%H:%M:%S.", time.localtime(second))
+        _timestamp_cache = (second, prefix)
+    return f"{prefix}{int((now - second) * 1000):03d}"
+
+
+def encode_write(command):
+    """Build a "write" payload: the command text and its encoded bytes.
+
+    Called by the producer so the str->bytes conversion happens on the
+    request thread, not in the device worker.
+    """
+    return command, command.encode()
+
+
+def _create_waker():
+    """Create the worker wake-up object, falling back to a LockWaker."""
+    if sys.platform.startswith("linux"):
+        try:
+            return SelectorWaker()
+        except OSError:
+            pass
+    return LockWaker()
+
+
 class DeviceWorker:
     """Worker thread for a single device."""
 
     def __init__(self, device_state):
         self.device = device_state
         self._cmd_queue = None
+        self._latest_writes = None
+        self._latest_lock = threading.Lock()
         self._wake_event = None
         self._worker_thread = None
         self._worker_running = False
         self._timer_manager = None
+        # Incremental decoder: a UTF-8 character split across two reads is
+        # decoded whole instead of as two replacement characters
+        self._rx_decoder = None
+        self._rx_serial = None
         self._logger = logging.getLogger(f"{__name__}.{device_state.device_id}")
 
     def start(self):
@@ -35,8 +210,13 @@ class DeviceWorker:
         if self._worker_thread is not None and self._worker_thread.is_alive():
             return
 
-        self._cmd_queue = queue.Queue()
-        self._wake_event = threading.Event()
+        # deque append/popleft are atomic under the GIL: producers and the
+        # worker need no lock or condition variable around the queue
+        self._cmd_queue = collections.deque()
+        # key -> newest pending command; its "latest" queue entry keeps the
+        # FIFO position of the first command queued under that key
+        self._latest_writes = {}
+        self._wake_event = _create_waker()
         self._timer_manager = TimerManager()
         self._worker_running = True
         self._worker_thread = threading.Thread(
@@ -52,10 +232,16 @@ class DeviceWorker:
         self._worker_running = False
         if self._wake_event is not None:
             self._wake_event.set()
+        stopped = True
         if self._worker_thread is not None:
             self._worker_thread.join(timeout=1)
+            stopped = not self._worker_thread.is_alive()
             self._worker_thread = None
         self._cmd_queue = None
+        self._latest_writes = None
+        # Only release the pipe once the worker can no longer be waiting on it
+        if stopped and isinstance(self._wake_event, SelectorWaker):
+            self._wake_event.close()
         self._wake_event = None
         if self._timer_manager is not None:
             self._timer_manager.clear()
@@ -74,7 +260,27 @@ class DeviceWorker:
         """Add a command to the worker queue."""
         if self._cmd_queue is None:
             return False
-        self._cmd_queue.put((cmd_type, cmd_data, done_event))
+        self._cmd_queue.append((cmd_type, cmd_data, done_event))
+        self._wake_event.set()
+        return True
+
+    def enqueue_latest(self, key, command):
+        """Queue a serial write that replaces any pending write with the same key.
+
+        For high-rate setpoints (e.g. a dragged motor slider) only the newest
+        value matters; older ones still pending are dropped. The write keeps
+        the queue position of the first pending one, so it is still sent
+        before any command queued after it.
+        """
+        latest_writes = self._latest_writes
+        cmd_queue = self._cmd_queue
+        if latest_writes is None or cmd_queue is None:
+            return False
+        with self._latest_lock:
+            pending = key in latest_writes
+            latest_writes[key] = command
+            if not pending:
+                cmd_queue.append(("latest", key, None))
         self._wake_event.set()
         return True
 
@@ -82,10 +288,18 @@ class DeviceWorker:
         """Add a command to the queue and wait for completion."""
         if self._cmd_queue is None:
             return False
-        done_event = threading.Event()
-        self._cmd_queue.put((cmd_type, cmd_data, done_event))
+        done_event = getattr(_wait_local, "done_event", None)
+        if done_event is None:
+            done_event = _wait_local.done_event = threading.Event()
+        else:
+            done_event.clear()
+        self._cmd_queue.append((cmd_type, cmd_data, done_event))
         self._wake_event.set()
-        return done_event.wait(timeout=timeout)
+        if done_event.wait(timeout=timeout):
+            return True
+        # Still queued: the worker may set() it later, so never reuse it
+        _wait_local.done_event = None
+        return False
 
     def run_in_worker(self, func, timeout=2.0):
         """Run a function in the worker thread and wait for completion."""
@@ -103,86 +317,159 @@ class DeviceWorker:
     def _worker_loop(self):
         """Main worker loop handling queue and timer tasks."""
         QUEUE_WARN_THRESHOLD = 10
+        cmd_queue = self._cmd_queue
+        latest_writes = self._latest_writes
+        latest_lock = self._latest_lock
+        wake_event = self._wake_event
+        watch_serial = getattr(wake_event, "watch", None)
+        monotonic = time.monotonic
 
         while self._worker_running:
             # Check for queue backlog
-            qsize = self._cmd_queue.qsize()
+            qsize = len(cmd_queue)
             if qsize > QUEUE_WARN_THRESHOLD:
                 self._logger.warning(f"Worker queue backlog: {qsize} commands pending")
 
             # Process all queued commands (non-blocking)
-            try:
-                while True:
-                    cmd_type, cmd_data, done_event = self._cmd_queue.get_nowait()
-
-                    if cmd_type == "call":
-                        try:
-                            cmd_data()
-                        except Exception as e:
-                            self._logger.warning(f"Worker call error: {e}")
-                    elif cmd_type == "write":
-                        self._serial_write_direct(cmd_data)
-
-                    if done_event is not None:
-                        done_event.set()
-
-            except queue.Empty:
-                pass
+            while True:
+                try:
+                    cmd_type, cmd_data, done_event = cmd_queue.popleft()
+                except IndexError:
+                    break
+
+                if cmd_type == "call":
+                    try:
+                        cmd_data()
+                    except Exception as e:
+                        self._logger.warning(f"Worker call error: {e}")
+                elif cmd_type == "write":
+                    self._serial_write_direct(cmd_data)
+                elif cmd_type == "latest":
+                    # Newest command for this key, queued by enqueue_latest()
+                    with latest_lock:
+                        command = latest_writes.pop(cmd_data, None)
+                    if command is not None:
+                        self._serial_write_direct(command)
+
+                if done_event is not None:
+                    done_event.set()
 
             # Execute timer callbacks
-            self._timer_manager.tick(time.time())
+            self._timer_manager.tick(monotonic())
 
             # Process incoming serial data
-            self._process_serial_rx()
+            got_data = self._process_serial_rx()
+            if watch_serial is not None and wake_event.serial_ready and not got_data:
+                # Readable but nothing to read (e.g. unplugged and hung up):
+                # stop selecting on it so the loop does not spin
+                wake_event.suspend(self.device.ser)
 
             # Calculate sleep time until next timer or use default
-            sleep_time = self._timer_manager.next_wake_time(time.time())
+            sleep_time = self._timer_manager.next_wake_time(monotonic())
             if sleep_time is None:
                 sleep_time = 1
 
-            # Wait for wake event or timeout
-            self._wake_event.wait(timeout=sleep_time)
-            self._wake_event.clear()
+            # Wait for wake event, serial data (selector waker) or timeout
+            if watch_serial is not None:
+                watch_serial(self.device.ser)
+            wake_event.wait(timeout=sleep_time)
+            wake_event.clear()
+
+    def write_direct(self, command):
+        """Write a command now and log it as TX (call from worker thread only).
+
+        Args:
+            command: encode_write() payload, or a plain command string
+
+        Returns:
+            True if the command was written.
+        """
+        return self._serial_write_direct(command)
 
     def _serial_write_direct(self, command):
-        """Direct serial write (call from worker thread only)."""
+        """Direct serial write (call from worker thread only).
+
+        Args:
+            command: encode_write() payload, or a plain command string
+
+        Returns:
+            True if the command was written.
+        """
+        # Closing a port also sets device.ser to None, so None is the closed
+        # check; a port that dies underneath is caught by the write itself
         ser = self.device.ser
-        if ser is None or not ser.isOpen():
-            return
+        if ser is None:
+            return False
 
+        if isinstance(command, str):
+            command = encode_write(command)
+        text, data = command
         try:
-            ser.write(command.encode())
-            ser.flush()
-            self._add_serial_log("TX", command)
+            # No flush(): it waits (tcdrain) until the UART has sent every
+            # byte, which adds milliseconds per command and guarantees nothing
+            ser.write(data)
+            self._add_serial_log("TX", text)
         except Exception as e:
             self._logger.warning(f"Serial write error: {e}")
+            return False
+        return True
 
     def _process_serial_rx(self):
-        """Read and log incoming serial data (non-blocking)."""
+        """Read and log incoming serial data (non-blocking).
+
+        Returns:
+            True if any data was read.
+        """
         ser = self.device.ser
-        if ser is None or not ser.isOpen():
-            return
+        if ser is None:
+            return False
+
+        if ser is not self._rx_serial:
+            # New port: drop any partial character left from the old one
+            self._rx_serial = ser
+            self._rx_decoder = _utf8_decoder(errors="replace")
 
         try:
             available = ser.in_waiting
             if available > 0:
                 raw_data = ser.read(available)
                 if raw_data:
-                    data_str = raw_data.decode(errors="replace")
-                    for line in data_str.splitlines(keepends=True):
-                        self._add_serial_log("RX", line)
+                    data_str = self._rx_decoder.decode(raw_data)
+                    lines = data_str.splitlines(keepends=True)
+                    if lines:
+                        self._add_serial_log_batch("RX", lines)
+                    return True
         except Exception:
             pass
+        return False
 
     def _add_serial_log(self, direction, data):
         """Add a log entry to device's serial log."""
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        log_id = self.device.log_next_id
-        self.device.log_next_id += 1
-        entry = {"id": log_id, "time": timestamp, "dir": direction, "data": data}
-        self.device.serial_log.append(entry)
-        if len(self.device.serial_log) > self.device.log_max_size:
-            self.device.serial_log = self.device.serial_log[-self.device.log_max_size :]
+        self._add_serial_log_batch(direction, (data,))
+
+    def _add_serial_log_batch(self, direction, lines):
+        """Add entries for lines received or sent together.
+
+        The batch shares one timestamp, one log append and one wake-up of
+        long-polling /api/log readers.
+        """
+        device = self.device
+        timestamp = _log_timestamp()
+        first_id = device.log_next_id
+        entries = [
+            {"id": log_id, "time": timestamp, "dir": direction, "data": data}
+            for log_id, data in enumerate(lines, first_id)
+        ]
+        log = device.serial_log
+        if log.maxlen != device.log_max_size:
+            # log_max_size was changed: rebuild the deque with the new bound
+            log = collections.deque(log, maxlen=device.log_max_size)
+            device.serial_log = log
+        # The deque drops the oldest entries itself once full
+        log.extend(entries)
+        device.log_next_id = first_id + len(entries)
+        with device.log_cond:
+            device.log_cond.notify_all()
 
 
 # Worker instances per device
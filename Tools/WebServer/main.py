@@ -45,7 +45,7 @@ from flask_cors import CORS
 
 from routes import register_routes, setup_clock_sync_timer
 from state import state
-from serial_utils import serial_open, start_device_worker
+from serial_utils import serial_open, start_device_worker, start_port_hotplug_monitor
 from monitor import start_monitor
 
 # Get the directory where this script is located
@@ -181,6 +181,10 @@ def main():
 
     app = create_app()
 
+    # Refresh the cached port list as soon as a serial device is plugged in
+    if start_port_hotplug_monitor():
+        logger.info("Serial port hotplug monitor started")
+
     # Log device count
     logger.info(f"Loaded {len(state.devices)} device(s)")
 
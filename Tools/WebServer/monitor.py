@@ -9,6 +9,8 @@ System monitoring functions for DutyCycle Web Server.
 Supports multi-device monitoring with independent timers per device.
 """
 
+import collections
+import functools
 import logging
 import math
 import os
@@ -17,11 +19,40 @@ import warnings
 
 import psutil
 
+from serial_utils import (
+    start_device_worker,
+    serial_write_direct,
+    get_device_timer_manager,
+    run_in_device_worker,
+)
+from device import map_value
+
+# Module logger
+logger = logging.getLogger(__name__)
+
+# Max samples averaged into one motor write when write_period is set
+MONITOR_WRITE_AVG_SAMPLES = 8
+
+# Audio level lookup: RMS is binned by its binary exponent and mantissa
+# (math.frexp), which is a log scale, so the bins are ~0.1 dB wide everywhere.
+AUDIO_RMS_MIN = 0.0001
+AUDIO_LUT_EXP_MIN = math.frexp(AUDIO_RMS_MIN)[1]
+AUDIO_LUT_EXP_MAX = 2  # RMS of clipped float samples stays below 2.0
+AUDIO_LUT_MANTISSA_BINS = 64
+# Monitor modes that read from the audio meter
+AUDIO_MODES = frozenset(("audio-level", "audio-left", "audio-right"))
+
+# Max backoff of a stable channel: period << 2 (4x the configured period)
+MONITOR_STABLE_BACKOFF_SHIFT = 2
+
+# Max backoff of a failing sampler: period << 4, capped at 5 seconds
+MONITOR_ERROR_BACKOFF_SHIFT = 4
+MONITOR_ERROR_BACKOFF_MAX = 5.0
+
 try:
     import GPUtil
 except ImportError:
     GPUtil = None
-    logger = logging.getLogger(__name__)
     logger.warning("GPUtil not found. GPU usage monitoring will not be available.")
 
 try:
@@ -30,19 +61,10 @@ try:
     warnings.filterwarnings("ignore", message="data discontinuity", module="soundcard")
 except (ImportError, AssertionError, OSError) as e:
     sc = None
-    logger = logging.getLogger(__name__)
     logger.warning(
         f"soundcard not available: {e}. Audio level monitoring will not be available."
     )
 
-from serial_utils import (
-    start_device_worker,
-    serial_write_direct,
-    get_device_timer_manager,
-    run_in_device_worker,
-)
-from device import map_value
-
 
 def get_audio_devices():
     """Get list of available audio input devices."""
@@ -64,7 +86,6 @@ def get_audio_devices():
             )
         return devices, None
     except Exception as e:
-        logger = logging.getLogger(__name__)
         logger.exception(f"Error getting audio devices: {e}")
         return None, str(e)
 
@@ -75,22 +96,19 @@ def check_cmd_file(device):
         return
 
     try:
-        if os.path.exists(device.cmd_file):
-            with open(device.cmd_file, "r") as f:
-                for line in f:
-                    command = line.strip()
-                    if command:
-                        if not command.endswith("\r\n"):
-                            command += "\r\n"
-                        if device.ser:
-                            serial_write_direct(device, command)
-            os.remove(device.cmd_file)
-            logger = logging.getLogger(__name__)
-            logger.info(f"Command file {device.cmd_file} processed and removed")
+        with open(device.cmd_file, "r") as f:
+            for line in f:
+                command = line.strip()
+                if command:
+                    if not command.endswith("\r\n"):
+                        command += "\r\n"
+                    if device.ser:
+                        serial_write_direct(device, command)
+        os.remove(device.cmd_file)
+        logger.info(f"Command file {device.cmd_file} processed and removed")
     except FileNotFoundError:
         pass
-    except Exception as e:
-        logger = logging.getLogger(__name__)
+    except (OSError, UnicodeDecodeError) as e:
         logger.exception(f"Error processing command file: {e}")
 
 
@@ -104,11 +122,29 @@ def get_mem_usage():
     return psutil.virtual_memory().percent, None
 
 
+# Cached GPU probe result (None: not probed yet). GPUtil shells out to
+# nvidia-smi on every call, so hosts without a GPU are only probed once.
+_gpu_available = None
+
+
+def probe_gpu():
+    """Probe whether GPUtil sees any GPU and cache the result."""
+    global _gpu_available
+    _gpu_available = GPUtil is not None and bool(GPUtil.getGPUs())
+    logger.debug(f"GPU probe: available={_gpu_available}")
+    return _gpu_available
+
+
 def get_gpu_usage():
     """Get GPU usage percentage."""
     if GPUtil is None:
         return None, "GPUtil not available"
 
+    if _gpu_available is None:
+        probe_gpu()
+    if not _gpu_available:
+        return None, "No GPUs found"
+
     gpus = GPUtil.getGPUs()
     if not gpus:
         return None, "No GPUs found"
@@ -116,6 +152,36 @@ def get_gpu_usage():
     return gpus[0].load * 100, None
 
 
+@functools.lru_cache(maxsize=8)
+def _audio_percent_table(db_min, db_max):
+    """Build the RMS -> percent lookup table for a dB range."""
+    table = []
+    for exp in range(AUDIO_LUT_EXP_MIN, AUDIO_LUT_EXP_MAX + 1):
+        for i in range(AUDIO_LUT_MANTISSA_BINS):
+            # Bin center: mantissa in [0.5, 1.0)
+            mantissa = 0.5 + (i + 0.5) / (2 * AUDIO_LUT_MANTISSA_BINS)
+            db = 20 * math.log10(math.ldexp(mantissa, exp))
+            normalized = (db - db_min) / (db_max - db_min)
+            table.append(max(0, min(100, normalized * 100)))
+    return table
+
+
+def _rms_to_percent(rms, db_min, db_max):
+    """Map an RMS level to 0-100 percent on the [db_min, db_max] dB scale."""
+    if rms <= AUDIO_RMS_MIN:
+        return 0
+
+    mantissa, exp = math.frexp(rms)
+    if exp > AUDIO_LUT_EXP_MAX:
+        mantissa, exp = 0.9999, AUDIO_LUT_EXP_MAX
+
+    table = _audio_percent_table(db_min, db_max)
+    index = (exp - AUDIO_LUT_EXP_MIN) * AUDIO_LUT_MANTISSA_BINS + int(
+        (mantissa - 0.5) * 2 * AUDIO_LUT_MANTISSA_BINS
+    )
+    return table[index]
+
+
 def get_audio_level(device):
     """Get audio level percentage with RMS-based mapping.
 
@@ -132,7 +198,7 @@ def get_audio_level(device):
 
     try:
         data = _get_cached_audio_data(device)
-        audio_channel = getattr(device, "audio_channel", "mix")
+        audio_channel = device.audio_channel
 
         if audio_channel == "left":
             # 左声道 (channel 0)
@@ -152,19 +218,9 @@ def get_audio_level(device):
             return 0, None
 
         sum_sq = sum(s * s for s in samples)
-        count = len(samples)
-        rms = math.sqrt(sum_sq / count) if count > 0 else 0
+        rms = math.sqrt(sum_sq / len(samples))
 
-        if rms <= 0.0001:
-            return 0, None
-
-        db = 20 * math.log10(rms)
-        db_min = device.audio_db_min
-        db_max = device.audio_db_max
-        normalized = (db - db_min) / (db_max - db_min)
-        percent = max(0, min(100, normalized * 100))
-
-        return percent, None
+        return _rms_to_percent(rms, device.audio_db_min, device.audio_db_max), None
     except Exception as e:
         return None, f"Error getting audio level: {e}"
 
@@ -174,7 +230,6 @@ def init_audio_meter(device):
     if sc is None:
         return False
 
-    logger = logging.getLogger(__name__)
     logger.info(
         f"Initializing audio meter, requested device_id: {device.audio_device_id}"
     )
@@ -243,7 +298,6 @@ def init_audio_meter(device):
 
 def cleanup_audio_meter(device):
     """Cleanup audio recorder for a device."""
-    logger = logging.getLogger(__name__)
     recorder = device.audio_recorder
     device.audio_recorder = None
     device._audio_cache = None
@@ -279,7 +333,6 @@ def check_threshold_alarm(device):
         cmd = f"alarm -c PLAY_TONE --freq {device.threshold_freq} --duration {device.threshold_duration}\r\n"
         if device.ser:
             serial_write_direct(device, cmd)
-        logger = logging.getLogger(__name__)
         logger.info(
             f"Threshold alarm triggered: {threshold_mode}={value:.1f}% > {device.threshold_value}%"
         )
@@ -306,7 +359,7 @@ def _get_cached_audio_data(device):
     """
     now = time.time()
     cache_ttl = 0.05  # 50ms cache window
-    cached = getattr(device, "_audio_cache", None)
+    cached = device._audio_cache
     if cached is not None:
         cached_time, cached_data = cached
         if now - cached_time < cache_ttl:
@@ -343,92 +396,202 @@ def get_audio_level_channel(device, channel):
             return 0, None
 
         sum_sq = sum(s * s for s in samples)
-        count = len(samples)
-        rms = math.sqrt(sum_sq / count) if count > 0 else 0
-
-        if rms <= 0.0001:
-            return 0, None
-
-        db = 20 * math.log10(rms)
-        db_min = device.audio_db_min
-        db_max = device.audio_db_max
-        normalized = (db - db_min) / (db_max - db_min)
-        percent = max(0, min(100, normalized * 100))
+        rms = math.sqrt(sum_sq / len(samples))
 
-        return percent, None
+        return _rms_to_percent(rms, device.audio_db_min, device.audio_db_max), None
     except Exception as e:
         return None, f"Error getting audio level: {e}"
 
 
+# mode -> (sampler(device) -> (percent, error), immediate). Audio modes push
+# with -I so the needle follows the level without motor smoothing.
+_CHANNEL_SAMPLERS = {
+    "cpu-usage": (lambda device: get_cpu_usage(), False),
+    "mem-usage": (lambda device: get_mem_usage(), False),
+    "gpu-usage": (lambda device: get_gpu_usage(), False),
+    "audio-left": (lambda device: get_audio_level_channel(device, "left"), True),
+    "audio-right": (lambda device: get_audio_level_channel(device, "right"), True),
+    # Legacy mode - uses device.audio_channel setting
+    "audio-level": (lambda device: get_audio_level(device), True),
+}
+
+
 def _get_channel_value(device, mode):
     """Get value for a specific monitor mode."""
-    logger = logging.getLogger(__name__)
-
     if mode == "none" or mode is None:
         return None, None, False
 
-    if mode == "cpu-usage":
-        percent, error = get_cpu_usage()
-        return percent, error, False
-    elif mode == "mem-usage":
-        percent, error = get_mem_usage()
-        return percent, error, False
-    elif mode == "gpu-usage":
-        percent, error = get_gpu_usage()
-        return percent, error, False
-    elif mode == "audio-left":
-        percent, error = get_audio_level_channel(device, "left")
-        logger.debug(f"audio-left: percent={percent}, error={error}")
-        return percent, error, True
-    elif mode == "audio-right":
-        percent, error = get_audio_level_channel(device, "right")
-        logger.debug(f"audio-right: percent={percent}, error={error}")
-        return percent, error, True
-    elif mode == "audio-level":
-        # Legacy mode - uses device.audio_channel setting
-        percent, error = get_audio_level(device)
-        logger.debug(f"audio-level: percent={percent}, error={error}")
-        return percent, error, True
-
-    return None, f"Unknown mode: {mode}", False
+    entry = _CHANNEL_SAMPLERS.get(mode)
+    if entry is None:
+        return None, f"Unknown mode: {mode}", False
+
+    sampler, immediate = entry
+    percent, error = sampler(device)
+    if percent is not None:
+        # Round once here for display; status/value handlers serve it as is
+        percent = round(percent, 2)
+    if immediate:
+        # Lazy %-args: this runs every audio tick, usually with DEBUG off
+        logger.debug("%s: percent=%s, error=%s", mode, percent, error)
+    elif error is None:
+        # Publish for api_monitor_value so the UI does not re-sample
+        device.last_samples[mode] = (percent, time.monotonic())
+    return percent, error, immediate
+
+
+def get_recent_sample(device, mode):
+    """Return the monitor's last value for mode if it is still fresh.
+
+    A sample is fresh while the monitor is running and it is no older than
+    the current timer interval of a channel sampling that mode (the period,
+    or longer while the channel is backed off). Returns None otherwise.
+    """
+    if not device.monitor_running:
+        return None
+    sample = device.last_samples.get(mode)
+    if sample is None:
+        return None
+    if device.monitor_mode_0 == mode:
+        timer = device.monitor_timer_0
+    elif device.monitor_mode_1 == mode:
+        timer = device.monitor_timer_1
+    else:
+        return None
+    if timer is None:
+        return None
+    value, timestamp = sample
+    if time.monotonic() - timestamp > timer.interval:
+        return None
+    return value
+
+
+def _apply_channel_backoff(device, channel, shift, max_interval=None):
+    """Set a channel timer interval to its configured period << shift."""
+    if channel == 0:
+        timer, period = device.monitor_timer_0, device.period_0
+    else:
+        timer, period = device.monitor_timer_1, device.period_1
+    if timer is None:
+        return
+
+    interval = period * (1 << shift)
+    if max_interval is not None and interval > max_interval:
+        interval = max(period, max_interval)
+    if timer.interval != interval:
+        timer.set_interval(interval)
 
 
 def _create_channel_tick(device, channel):
     """Create a monitor tick callback for a specific channel (0 or 1)."""
+    # Last motor value written for audio modes; audio levels are pushed only
+    # on change so that silence does not keep the serial link busy.
+    last_audio_value = None
+    # Consecutive ticks without a motor value change (drives period backoff)
+    last_motor_value = None
+    stable_ticks = 0
+    # Consecutive sampler errors (drives error backoff)
+    error_count = 0
+    # Samples averaged between motor writes (write_period > 0)
+    samples = collections.deque(maxlen=MONITOR_WRITE_AVG_SAMPLES)
+    last_write_time = 0.0
 
     def channel_tick():
+        nonlocal last_audio_value, last_motor_value, stable_ticks, error_count
+        nonlocal last_write_time
+
         if not device.monitor_running:
             return
 
         if channel == 0:
-            mode = getattr(device, "monitor_mode_0", "none")
+            mode = device.monitor_mode_0
         else:
-            mode = getattr(device, "monitor_mode_1", "none")
+            mode = device.monitor_mode_1
+
+        # Audio meter is opened on the first audio tick of either channel,
+        # once per monitor start
+        if (
+            not device._audio_init_tried
+            and mode in AUDIO_MODES
+            and device.audio_recorder is None
+        ):
+            device._audio_init_tried = True
+            logger.info("Initializing audio meter for audio monitoring mode")
+            init_audio_meter(device)
 
         percent, error, immediate = _get_channel_value(device, mode)
 
         if error is None and percent is not None:
+            error_count = 0
+            # Only store on change: the HTTP status handlers poll these
             if channel == 0:
-                device.last_percent_0 = percent
-            else:
+                if device.last_percent_0 != percent:
+                    device.last_percent_0 = percent
+            elif device.last_percent_1 != percent:
                 device.last_percent_1 = percent
 
-            motor_value = map_value(percent, 0, 100, device.motor_min, device.motor_max)
-
-            if channel == 0:
-                cmd_str = f"ctrl -c SET_MOTOR_VALUE -M {int(motor_value)}"
-            else:
-                cmd_str = f"ctrl -c SET_MOTOR_VALUE -M {int(motor_value)} --id 1"
+            # Two-rate mode: sample every period but drive the motor with the
+            # mean of the recent samples once per write_period.
+            write_due = True
+            if device.write_period > 0 and not immediate:
+                samples.append(percent)
+                now = time.monotonic()
+                if now - last_write_time < device.write_period:
+                    write_due = False
+                else:
+                    percent = sum(samples) / len(samples)
+                    samples.clear()
+                    last_write_time = now
+
+            if write_due:
+                motor_value = int(
+                    map_value(percent, 0, 100, device.motor_min, device.motor_max)
+                )
 
-            if immediate:
-                cmd_str += " -I"
-            if device.ser:
-                serial_write_direct(device, f"{cmd_str}\r\n")
+                if channel == 0:
+                    cmd_str = f"ctrl -c SET_MOTOR_VALUE -M {motor_value}"
+                else:
+                    cmd_str = f"ctrl -c SET_MOTOR_VALUE -M {motor_value} --id 1"
+
+                if immediate:
+                    cmd_str += " -I"
+                if device.ser and not (immediate and motor_value == last_audio_value):
+                    serial_write_direct(device, f"{cmd_str}\r\n")
+                    if immediate:
+                        last_audio_value = motor_value
+
+                if motor_value == last_motor_value:
+                    stable_ticks += 1
+                else:
+                    stable_ticks = 0
+                last_motor_value = motor_value
+
+                # Slow down sampling while the value is static (audio stays at the
+                # configured rate to keep the needle responsive).
+                if immediate:
+                    _apply_channel_backoff(device, channel, 0)
+                else:
+                    _apply_channel_backoff(
+                        device,
+                        channel,
+                        min(stable_ticks, MONITOR_STABLE_BACKOFF_SHIFT),
+                    )
+        elif error is not None:
+            # Don't hammer a failing sampler (e.g. missing GPU, dead audio
+            # endpoint) at the full sample rate.
+            error_count += 1
+            _apply_channel_backoff(
+                device,
+                channel,
+                min(error_count, MONITOR_ERROR_BACKOFF_SHIFT),
+                MONITOR_ERROR_BACKOFF_MAX,
+            )
 
         # 更新 legacy last_percent (用于兼容)
         p0 = device.last_percent_0
         p1 = device.last_percent_1
-        device.last_percent = p0 if p0 is not None else (p1 or 0)
+        last_percent = p0 if p0 is not None else (p1 or 0)
+        if device.last_percent != last_percent:
+            device.last_percent = last_percent
 
         # 阈值报警检查 (独立于监控模式，仅在 CH0 tick 中执行避免重复)
         if channel == 0:
@@ -446,46 +609,34 @@ def _create_cmd_file_tick(device):
     return cmd_file_tick
 
 
-def _needs_audio_init(device):
-    """Check if any monitor mode requires audio initialization."""
-    mode_0 = getattr(device, "monitor_mode_0", "none")
-    mode_1 = getattr(device, "monitor_mode_1", "none")
-    audio_modes = ("audio-level", "audio-left", "audio-right")
-    needs_audio = mode_0 in audio_modes or mode_1 in audio_modes
-    logger = logging.getLogger(__name__)
-    logger.debug(
-        f"_needs_audio_init: mode_0={mode_0}, mode_1={mode_1}, needs_audio={needs_audio}"
-    )
-    return needs_audio
-
-
 def start_monitor(device, mode):
     """Start monitoring for a device."""
-    logger = logging.getLogger(__name__)
-
     if device.monitor_running:
         stop_monitor(device)
 
+    # Re-probe the GPU on every start so a newly installed driver is picked up
+    if "gpu-usage" in (device.monitor_mode_0, device.monitor_mode_1):
+        probe_gpu()
+
     # Start device worker first
     start_device_worker(device)
 
     def setup():
-        # Check if any channel needs audio
-        if _needs_audio_init(device):
-            logger.info("Initializing audio meter for audio monitoring mode")
-            init_audio_meter(device)
+        # The audio meter is opened lazily by the first audio channel tick, so
+        # starting (and failing) monitors does not pay for device enumeration.
         device.monitor_mode = mode
         device.monitor_running = True
+        device._audio_init_tried = False
         tm = get_device_timer_manager(device)
         if tm is not None:
             # CH0 独立定时器
-            mode_0 = getattr(device, "monitor_mode_0", "none")
+            mode_0 = device.monitor_mode_0
             if mode_0 and mode_0 != "none":
                 device.monitor_timer_0 = tm.add(
                     device.period_0, _create_channel_tick(device, 0), "monitor_ch0"
                 )
             # CH1 独立定时器
-            mode_1 = getattr(device, "monitor_mode_1", "none")
+            mode_1 = device.monitor_mode_1
             if mode_1 and mode_1 != "none":
                 device.monitor_timer_1 = tm.add(
                     device.period_1, _create_channel_tick(device, 1), "monitor_ch1"
@@ -9,18 +9,33 @@ Flask API routes for DutyCycle Web Server.
 Supports multi-device operations via device_id parameter.
 """
 
+import functools
 import logging
+import zlib
 from datetime import datetime
+from itertools import islice
+from operator import attrgetter
 
 from flask import jsonify, request, render_template
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 from state import state
 from serial_utils import (
-    scan_serial_ports,
+    scan_serial_ports_cached,
     serial_open,
     serial_write,
     serial_write_async,
-    serial_write_direct,
+    serial_write_logged,
     start_device_worker,
     stop_device_worker,
     run_in_device_worker,
@@ -29,6 +44,7 @@ from serial_utils import (
 from device import (
     set_motor_value,
     set_motor_percent,
+    clock_set_command,
     config_clock,
     set_motor_unit,
     set_clock_map,
@@ -45,13 +61,153 @@ from monitor import (
     get_cpu_usage,
     get_mem_usage,
     get_gpu_usage,
+    get_recent_sample,
     get_audio_devices,
     GPUtil,
     sc,
 )
 
-# Clock sync check interval: 1 hour (check if 24h has passed)
+
+def _optional(value):
+    """Map empty values ("", None) to None."""
+    return value if value else None
+
+
+def _non_negative_float(value):
+    """Convert to float, clamping negative values to 0."""
+    return max(0.0, float(value))
+
+
+# Plain api_config fields: key (== DeviceState attribute) -> converter, or
+# None to store the value as is. Fields with side effects are handled in
+# api_config itself.
+CONFIG_FIELDS = {
+    "motor_max": int,
+    "motor_min": int,
+    "motor_unit_0": None,
+    "motor_unit_1": None,
+    "period": float,
+    "period_0": float,
+    "period_1": float,
+    "write_period": _non_negative_float,
+    "cmd_file": _optional,
+    "cmd_file_enabled": bool,
+    "audio_db_min": float,
+    "audio_db_max": float,
+    "audio_device_id": _optional,
+    "threshold_enable": bool,
+    "threshold_mode": None,
+    "threshold_value": float,
+    "threshold_freq": int,
+    "threshold_duration": int,
+}
+
+# System monitor modes api_monitor_value can sample on demand
+_MONITOR_VALUE_FNS = {
+    "cpu-usage": get_cpu_usage,
+    "mem-usage": get_mem_usage,
+    "gpu-usage": get_gpu_usage,
+}
+
+# Longest time api_log may hold a caught-up request waiting for new entries
+LOG_WAIT_MAX = 5.0
+
+# api_log responses with more entries than this are streamed in batches
+LOG_STREAM_THRESHOLD = 500
+LOG_STREAM_BATCH = 64
+
+# api_status fields copied as-is from DeviceState (key == attribute name)
+STATUS_FIELDS = (
+    "device_id",
+    "port",
+    "baudrate",
+    "motor_max",
+    "motor_min",
+    "motor_unit_0",
+    "motor_unit_1",
+    "monitor_mode",
+    "monitor_mode_0",
+    "monitor_mode_1",
+    "monitor_running",
+    "period",
+    "period_0",
+    "period_1",
+    "write_period",
+    "cmd_file",
+    "cmd_file_enabled",
+    "audio_db_min",
+    "audio_db_max",
+    "audio_device_id",
+    "auto_sync_clock",
+    "last_sync_time",
+    "threshold_enable",
+    "threshold_mode",
+    "threshold_value",
+    "threshold_freq",
+    "threshold_duration",
+)
+_get_status_fields = attrgetter(*STATUS_FIELDS)
+
+# Clock sync period: resync the device clock every 24h
+CLOCK_SYNC_PERIOD = 24 * 3600  # seconds
+
+# Longest wait between wall-clock checks of the sync deadline; also the first
+# retry delay when a sync could not be sent, halved on each failure
 CLOCK_SYNC_CHECK_INTERVAL = 3600  # seconds
+CLOCK_SYNC_RETRY_MIN = 300  # seconds
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that encodes responses and parses requests with orjson."""
+
+    # Allow int keys like the stdlib encoder and numpy scalars/arrays from the
+    # audio meter; other unsupported types fall back to Flask's default hook.
+    option = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if orjson is not None
+        else 0
+    )
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        # orjson.JSONDecodeError subclasses ValueError, which request.get_json
+        # already handles
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option),
+            mimetype=self.mimetype,
+        )
+
+
+def _parsed_sync_time(device):
+    """Get device.last_sync_time as a datetime, parsing it only when it changes.
+
+    Returns:
+        datetime, or None if never synced or the stored value is invalid.
+    """
+    src = device.last_sync_time
+    if src != device._last_sync_parsed_src:
+        parsed = None
+        if src:
+            try:
+                parsed = datetime.fromisoformat(src)
+            except (TypeError, ValueError):
+                pass
+        device._last_sync_parsed = parsed
+        device._last_sync_parsed_src = src
+    return device._last_sync_parsed
+
+
+def _record_sync_time(device, now):
+    """Store a successful clock sync time without a later re-parse."""
+    device.last_sync_time = now.isoformat()
+    device._last_sync_parsed = now
+    device._last_sync_parsed_src = device.last_sync_time
 
 
 def setup_clock_sync_timer(device):
@@ -62,58 +218,141 @@ def setup_clock_sync_timer(device):
         return
 
     # Remove existing clock sync timer if any
-    for timer in timer_manager.timers[:]:
-        if timer.name == "clock_sync":
-            timer_manager.remove(timer)
+    timer_manager.remove_by_name("clock_sync")
+
+    retry_interval = CLOCK_SYNC_CHECK_INTERVAL
 
     def check_clock_sync():
-        """Check if clock sync is needed and perform it."""
+        """Sync the clock if due, then check again within the hour."""
+        nonlocal retry_interval
         if not device.auto_sync_clock:
+            # Re-armed by setup_clock_sync_timer() when enabled again
+            sync_timer.enabled = False
             return
         if device.ser is None:
+            # Not connected: api_connect re-arms via setup_clock_sync_timer()
+            sync_timer.enabled = False
             return
 
-        need_sync = True
-        if device.last_sync_time:
-            try:
-                last_sync = datetime.fromisoformat(device.last_sync_time)
-                hours_since = (datetime.now() - last_sync).total_seconds() / 3600
-                need_sync = hours_since >= 24
-            except Exception:
-                pass
+        seconds_since = None
+        last_sync = _parsed_sync_time(device)
+        if last_sync is not None:
+            seconds_since = (datetime.now() - last_sync).total_seconds()
 
-        if need_sync:
+        if seconds_since is None or seconds_since >= CLOCK_SYNC_PERIOD:
             logger.info(f"[{device.name}] Auto clock sync triggered")
             now = datetime.now()
-            command = (
-                f"clock -c SET -y {now.year} -m {now.month} -d {now.day}"
-                f" -H {now.hour} -M {now.minute} -S {now.second}\r\n"
-            )
-            serial_write_direct(device, command)
-            device.last_sync_time = now.isoformat()
-            state.save_config()
+            if not serial_write_logged(device, clock_set_command(now)):
+                # Write failed: retry with a shrinking interval
+                logger.warning(f"[{device.name}] Clock sync write failed")
+                retry_interval = max(retry_interval / 2, CLOCK_SYNC_RETRY_MIN)
+                sync_timer.set_interval(retry_interval)
+                return
+            retry_interval = CLOCK_SYNC_CHECK_INTERVAL
+            _record_sync_time(device, now)
+            state.mark_dirty()
             logger.info(f"[{device.name}] Clock synced at {device.last_sync_time}")
+            seconds_since = 0
 
-    timer_manager.add(CLOCK_SYNC_CHECK_INTERVAL, check_clock_sync, "clock_sync")
-    logger.info(
-        f"[{device.name}] Clock sync timer started (check every {CLOCK_SYNC_CHECK_INTERVAL}s)"
-    )
-
+        # The timer runs on the monotonic clock, which stops during suspend:
+        # re-check the wall-clock deadline at least hourly instead of
+        # sleeping until it
+        remaining = CLOCK_SYNC_PERIOD - seconds_since
+        sync_timer.set_interval(min(max(remaining, 1), CLOCK_SYNC_CHECK_INTERVAL))
 
-def get_device_from_request():
-    """Get device from request, defaulting to active device."""
-    device_id = (
-        request.args.get("device_id") or request.json.get("device_id")
-        if request.json
-        else None
+    # Fires on the next worker tick, then reschedules itself
+    sync_timer = timer_manager.add(
+        CLOCK_SYNC_CHECK_INTERVAL, check_clock_sync, "clock_sync"
     )
-    if device_id:
-        return state.get_device(device_id)
-    return state.get_active_device()
+    logger.info(f"[{device.name}] Clock sync timer started")
+
+
+def get_available_monitor_modes():
+    """Get monitoring modes supported by the installed optional modules."""
+    modes = [
+        {"value": "cpu-usage", "label": "CPU 占用率"},
+        {"value": "mem-usage", "label": "内存使用率"},
+    ]
+    if GPUtil is not None:
+        modes.append({"value": "gpu-usage", "label": "GPU 占用率"})
+    if sc is not None:
+        modes.append({"value": "audio-level", "label": "音频响度"})
+        modes.append({"value": "audio-left", "label": "音频 左声道"})
+        modes.append({"value": "audio-right", "label": "音频 右声道"})
+    return modes
+
+
+# Channel modes api_monitor_start accepts (fixed at import, like the modes list)
+_VALID_MONITOR_MODES = frozenset(
+    [mode["value"] for mode in get_available_monitor_modes()] + ["none"]
+)
 
 
 def register_routes(app):
     """Register all routes with the Flask app."""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+    else:
+        # Flask 3 replaced JSON_SORT_KEYS/JSONIFY_PRETTYPRINT_REGULAR with
+        # provider attributes: emit compact output in insertion order
+        app.json.sort_keys = False
+        app.json.compact = True
+
+    def encode(obj):
+        """Serialize obj to response bytes, so Response skips str encoding."""
+        return app.json.dumps(obj).encode()
+
+    # Constant responses, encoded once (optional module availability is
+    # fixed at import time)
+    monitor_modes_body = encode(
+        {"success": True, "modes": get_available_monitor_modes()}
+    )
+    motor_units_body = encode({"success": True, "units": VALID_UNITS})
+    device_not_found_body = encode({"success": False, "error": "Device not found"})
+    ok_body = encode({"success": True})
+
+    def ok_response():
+        """Build a plain success response from the pre-encoded body."""
+        return app.response_class(ok_body, mimetype="application/json")
+
+    def json_with_etag(body, etag):
+        """Build a JSON response with a weak ETag, or 304 if the client has it."""
+        response = app.response_class(body, mimetype="application/json")
+        response.set_etag(etag, weak=True)
+        return response.make_conditional(request)
+
+    def monitor_value_response(mode, value):
+        """Build the api_monitor_value success response, tagged by value."""
+        body = encode({"success": True, "value": value, "mode": mode})
+        return json_with_etag(body, f"{mode}:{value}")
+
+    # Bound once: every device-scoped request looks its device up here
+    # (state.devices is never rebound)
+    get_device = state.devices.get
+
+    def with_device(view):
+        """Resolve the target device and call view(device, data).
+
+        The device is taken from the device_id query parameter, then the JSON
+        body, then the active device; data is the JSON body (or {}).
+        """
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            data = request.get_json(silent=True) or {}
+            device_id = (
+                request.args.get("device_id")
+                or data.get("device_id")
+                or state.active_device_id
+            )
+            device = get_device(device_id)
+            if not device:
+                return app.response_class(
+                    device_not_found_body, mimetype="application/json"
+                )
+            return view(device, data, *args, **kwargs)
+
+        return wrapper
 
     @app.route("/")
     def index():
@@ -137,10 +376,10 @@ def register_routes(app):
     @app.route("/api/devices", methods=["POST"])
     def api_add_device():
         """Add a new device."""
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         name = data.get("name", "新设备")
         device_id = state.add_device(name=name)
-        state.save_config()
+        state.mark_dirty()
         return jsonify({"success": True, "device_id": device_id})
 
     @app.route("/api/devices/<device_id>", methods=["DELETE"])
@@ -160,8 +399,8 @@ def register_routes(app):
                 device.ser = None
 
         if state.remove_device(device_id):
-            state.save_config()
-            return jsonify({"success": True})
+            state.mark_dirty()
+            return ok_response()
         return jsonify({"success": False, "error": "Device not found"})
 
     @app.route("/api/devices/<device_id>", methods=["PUT"])
@@ -171,20 +410,20 @@ def register_routes(app):
         if not device:
             return jsonify({"success": False, "error": "Device not found"})
 
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         if "name" in data:
             device.name = data["name"]
-        state.save_config()
-        return jsonify({"success": True})
+        state.mark_dirty()
+        return ok_response()
 
     @app.route("/api/devices/active", methods=["POST"])
     def api_set_active_device():
         """Set the active device."""
-        data = request.json or {}
+        data = request.get_json(silent=True) or {}
         device_id = data.get("device_id")
         if state.set_active_device(device_id):
-            state.save_config()
-            return jsonify({"success": True})
+            state.mark_dirty()
+            return ok_response()
         return jsonify({"success": False, "error": "Device not found"})
 
     # ============== Port & Connection ==============
@@ -192,18 +431,13 @@ def register_routes(app):
     @app.route("/api/ports", methods=["GET"])
     def api_get_ports():
         """Get available serial ports."""
-        ports = scan_serial_ports()
+        ports = scan_serial_ports_cached()
         return jsonify({"success": True, "ports": ports})
 
     @app.route("/api/connect", methods=["POST"])
-    def api_connect():
+    @with_device
+    def api_connect(device, data):
         """Connect to a serial port."""
-        data = request.json
-        device_id = data.get("device_id") or state.active_device_id
-        device = state.get_device(device_id)
-        if not device:
-            return jsonify({"success": False, "error": "Device not found"})
-
         port = data.get("port")
         baudrate = data.get("baudrate", 115200)
         timeout = data.get("timeout", 1)
@@ -211,7 +445,7 @@ def register_routes(app):
         # Start worker first
         start_device_worker(device)
 
-        result = {"error": None}
+        result = {"error": None, "clock_synced": False}
 
         def do_connect():
             if device.ser:
@@ -220,11 +454,23 @@ def register_routes(app):
             ser, error = serial_open(port, baudrate, timeout)
             if error:
                 result["error"] = error
-            else:
-                device.ser = ser
-                device.port = port
-                device.baudrate = baudrate
-                device.timeout = timeout
+                return
+            device.ser = ser
+            device.port = port
+            device.baudrate = baudrate
+            device.timeout = timeout
+
+            # Auto clock sync on connect (if needed), in the same worker call
+            if device.auto_sync_clock:
+                now = datetime.now()
+                last_sync = _parsed_sync_time(device)
+                if (
+                    last_sync is None
+                    or (now - last_sync).total_seconds() >= CLOCK_SYNC_PERIOD
+                ):
+                    if serial_write_logged(device, clock_set_command(now)):
+                        _record_sync_time(device, now)
+                        result["clock_synced"] = True
 
         if not run_in_device_worker(device, do_connect, timeout=5.0):
             return jsonify({"success": False, "error": "Connect timeout"})
@@ -233,48 +479,25 @@ def register_routes(app):
             return jsonify({"success": False, "error": result["error"]})
 
         device.auto_connect = True
-        state.save_config()
+        state.mark_dirty()
 
         # Setup periodic clock sync timer
         setup_clock_sync_timer(device)
 
-        # Auto clock sync on connect (if needed)
-        clock_synced = False
-        if device.auto_sync_clock:
-            need_sync = True
-            if device.last_sync_time:
-                try:
-                    last_sync = datetime.fromisoformat(device.last_sync_time)
-                    hours_since = (datetime.now() - last_sync).total_seconds() / 3600
-                    need_sync = hours_since >= 24
-                except Exception:
-                    pass
-            if need_sync:
-                _, error = config_clock(device)
-                if not error:
-                    device.last_sync_time = datetime.now().isoformat()
-                    state.save_config()
-                    clock_synced = True
-
         return jsonify(
             {
                 "success": True,
                 "port": port,
-                "device_id": device_id,
-                "clock_synced": clock_synced,
+                "device_id": device.device_id,
+                "clock_synced": result["clock_synced"],
                 "last_sync_time": device.last_sync_time,
             }
         )
 
     @app.route("/api/disconnect", methods=["POST"])
-    def api_disconnect():
+    @with_device
+    def api_disconnect(device, data):
         """Disconnect from serial port."""
-        data = request.json or {}
-        device_id = data.get("device_id") or state.active_device_id
-        device = state.get_device(device_id)
-        if not device:
-            return jsonify({"success": False, "error": "Device not found"})
-
         if device.monitor_running:
             stop_monitor(device)
 
@@ -288,137 +511,83 @@ def register_routes(app):
 
         device.auto_connect = False
         device.auto_monitor = False
-        state.save_config()
+        state.mark_dirty()
 
-        return jsonify({"success": True})
+        return ok_response()
 
     @app.route("/api/status", methods=["GET"])
-    def api_status():
+    @with_device
+    def api_status(device, data):
         """Get current device status."""
-        device_id = request.args.get("device_id") or state.active_device_id
-        device = state.get_device(device_id)
-        if not device:
-            return jsonify({"success": False, "error": "Device not found"})
-
-        connected = False
-        try:
-            connected = device.ser is not None and device.ser.isOpen()
-        except Exception:
-            pass
-
-        return jsonify(
-            {
+        # Every close path also clears device.ser: no isOpen() probe needed
+        connected = device.ser is not None
+
+        fields = _get_status_fields(device)
+        # Already rounded by the monitor
+        percents = (device.last_percent, device.last_percent_0, device.last_percent_1)
+        # Polled continuously but rarely changes: reuse the encoded body
+        # while every reported value is the same as last time
+        key = (device.name, connected, fields, percents)
+        cache = device._status_cache
+        if cache is None or cache[0] != key:
+            status = {
                 "success": True,
-                "device_id": device_id,
                 "device_name": device.name,
                 "connected": connected,
-                "port": device.port,
-                "baudrate": device.baudrate,
-                "motor_max": device.motor_max,
-                "motor_min": device.motor_min,
-                "motor_unit_0": getattr(device, "motor_unit_0", "NONE"),
-                "motor_unit_1": getattr(device, "motor_unit_1", "NONE"),
-                "monitor_mode": device.monitor_mode,
-                "monitor_mode_0": getattr(device, "monitor_mode_0", "none"),
-                "monitor_mode_1": getattr(device, "monitor_mode_1", "none"),
-                "monitor_running": device.monitor_running,
-                "period": device.period,
-                "period_0": getattr(device, "period_0", device.period),
-                "period_1": getattr(device, "period_1", device.period),
-                "last_percent": round(device.last_percent, 2),
-                "cmd_file": device.cmd_file,
-                "cmd_file_enabled": device.cmd_file_enabled,
-                "audio_db_min": device.audio_db_min,
-                "audio_db_max": device.audio_db_max,
-                "audio_device_id": device.audio_device_id,
-                "auto_sync_clock": device.auto_sync_clock,
-                "last_sync_time": device.last_sync_time,
-                "threshold_enable": device.threshold_enable,
-                "threshold_mode": device.threshold_mode,
-                "threshold_value": device.threshold_value,
-                "threshold_freq": device.threshold_freq,
-                "threshold_duration": device.threshold_duration,
-                "last_percent_0": round(
-                    getattr(device, "last_percent_0", device.last_percent), 2
-                ),
-                "last_percent_1": round(
-                    getattr(device, "last_percent_1", device.last_percent), 2
-                ),
             }
-        )
+            status.update(zip(STATUS_FIELDS, fields))
+            status["last_percent"] = percents[0]
+            status["last_percent_0"] = percents[1]
+            status["last_percent_1"] = percents[2]
+            body = encode(status)
+            etag = format(zlib.crc32(body), "08x")
+            cache = device._status_cache = (key, body, etag)
+        return json_with_etag(cache[1], cache[2])
 
     @app.route("/api/config", methods=["POST"])
-    def api_config():
+    @with_device
+    def api_config(device, data):
         """Update device configuration."""
-        data = request.json
-        device_id = data.get("device_id") or state.active_device_id
-        device = state.get_device(device_id)
-        if not device:
-            return jsonify({"success": False, "error": "Device not found"})
-
-        if "motor_max" in data:
-            device.motor_max = int(data["motor_max"])
-        if "motor_min" in data:
-            device.motor_min = int(data["motor_min"])
-        if "motor_unit_0" in data:
-            device.motor_unit_0 = data["motor_unit_0"]
-        if "motor_unit_1" in data:
-            device.motor_unit_1 = data["motor_unit_1"]
-        if "period" in data:
-            device.period = float(data["period"])
+        # The UI re-submits whole forms: only touch fields whose value changes
+        changed = set()
+        for key, value in data.items():
+            if key in CONFIG_FIELDS:
+                convert = CONFIG_FIELDS[key]
+                if convert is not None:
+                    value = convert(value)
+                if value != getattr(device, key):
+                    setattr(device, key, value)
+                    changed.add(key)
+
+        if "period" in changed:
             update_monitor_period(device, device.period)
-        if "period_0" in data:
-            device.period_0 = float(data["period_0"])
-        if "period_1" in data:
-            device.period_1 = float(data["period_1"])
-        if "cmd_file" in data:
-            device.cmd_file = data["cmd_file"] if data["cmd_file"] else None
-        if "cmd_file_enabled" in data:
-            device.cmd_file_enabled = bool(data["cmd_file_enabled"])
-        if "audio_db_min" in data:
-            device.audio_db_min = float(data["audio_db_min"])
-        if "audio_db_max" in data:
-            device.audio_db_max = float(data["audio_db_max"])
-        if "audio_device_id" in data:
-            device.audio_device_id = (
-                data["audio_device_id"] if data["audio_device_id"] else None
-            )
         if "audio_channel" in data:
-            if data["audio_channel"] in ("mix", "left", "right"):
-                device.audio_channel = data["audio_channel"]
+            audio_channel = data["audio_channel"]
+            if audio_channel in ("mix", "left", "right"):
+                if audio_channel != device.audio_channel:
+                    device.audio_channel = audio_channel
+                    changed.add("audio_channel")
         if "auto_sync_clock" in data:
-            device.auto_sync_clock = bool(data["auto_sync_clock"])
-        if "threshold_enable" in data:
-            device.threshold_enable = bool(data["threshold_enable"])
-        if "threshold_mode" in data:
-            device.threshold_mode = data["threshold_mode"]
-        if "threshold_value" in data:
-            device.threshold_value = float(data["threshold_value"])
-        if "threshold_freq" in data:
-            device.threshold_freq = int(data["threshold_freq"])
-        if "threshold_duration" in data:
-            device.threshold_duration = int(data["threshold_duration"])
-
-        state.save_config()
-        return jsonify({"success": True})
+            auto_sync_clock = bool(data["auto_sync_clock"])
+            if auto_sync_clock != device.auto_sync_clock:
+                device.auto_sync_clock = auto_sync_clock
+                changed.add("auto_sync_clock")
+                setup_clock_sync_timer(device)
+
+        if changed:
+            state.mark_dirty()
+        return ok_response()
 
     @app.route("/api/clock", methods=["POST"])
-    def api_clock():
+    @with_device
+    def api_clock(device, data):
         """Set device clock to current system time."""
-        data = request.json or {}
-        device_id = data.get("device_id") or state.active_device_id
-        device = state.get_device(device_id)
-        if not device:
-            return jsonify({"success": False, "error": "Device not found"})
-
         responses, error = config_clock(device)
         if error:
             return jsonify({"success": False, "error": error})
 
-        from datetime import datetime
-
-        device.last_sync_time = datetime.now().isoformat()
-        state.save_config()
+        _record_sync_time(device, datetime.now())
+        state.mark_dirty()
 
         return jsonify(
             {
@@ -429,14 +598,9 @@ def register_routes(app):
         )
 
     @app.route("/api/motor", methods=["POST"])
-    def api_motor():
+    @with_device
+    def api_motor(device, data):
         """Set motor value."""
-        data = request.json
-        device_id = data.get("device_id") or state.active_device_id
-        device = state.get_device(device_id)
-        if not device:
-            return jsonify({"success": False, "error": "Device not found"})
-
         immediate = data.get("immediate", False)
         async_mode = data.get("async", False)
         motor_id = data.get("motor_id")
@@ -460,14 +624,9 @@ def register_routes(app):
         return jsonify({"success": True, "responses": responses})
 
     @app.route("/api/motor/unit", methods=["POST"])
-    def api_motor_unit():
+    @with_device
+    def api_motor_unit(device, data):
         """Set motor unit type (HOUR, MINUTE, SECOND, etc.)."""
-        data = request.json
-        device_id = data.get("device_id") or state.active_device_id
-        device = state.get_device(device_id)
-        if not device:
-            return jsonify({"success": False, "error": "Device not found"})
-
         unit = data.get("unit")
         if not unit:
             return jsonify({"success": False, "error": "Missing unit parameter"})
@@ -481,21 +640,16 @@ def register_routes(app):
     @app.route("/api/motor/unit", methods=["GET"])
     def api_get_motor_units():
         """Get available motor unit types."""
-        return jsonify({"success": True, "units": VALID_UNITS})
+        return app.response_class(motor_units_body, mimetype="application/json")
 
     @app.route("/api/motor/clock-map", methods=["POST"])
-    def api_clock_map():
+    @with_device
+    def api_clock_map(device, data):
         """Set clock map entry.
 
         For HOUR/HOUR_COS_PHI: index is hour (0-24)
         For MINUTE/SECOND: index is 0-6 (mapping to 0,10,20,30,40,50,60)
         """
-        data = request.json
-        device_id = data.get("device_id") or state.active_device_id
-        device = state.get_device(device_id)
-        if not device:
-            return jsonify({"success": False, "error": "Device not found"})
-
         index = data.get("index")
         motor_value = data.get("motor_value")
 
@@ -511,73 +665,39 @@ def register_routes(app):
         return jsonify({"success": True, "responses": responses})
 
     @app.route("/api/motor/clock-map", methods=["GET"])
-    def api_list_clock_map():
+    @with_device
+    def api_list_clock_map(device, data):
         """List current clock map configuration."""
-        device_id = request.args.get("device_id") or state.active_device_id
-        device = state.get_device(device_id)
-        if not device:
-            return jsonify({"success": False, "error": "Device not found"})
-
         motor_id = request.args.get("motor_id", type=int)
         responses, error = list_clock_map(device, motor_id)
         if error:
             return jsonify({"success": False, "error": error})
         return jsonify({"success": True, "responses": responses})
 
-    @app.route("/api/motor/enable-clock", methods=["POST"])
-    def api_enable_clock_map():
-        """Enable clock map mode (return to clock display)."""
-        data = request.json or {}
-        device_id = data.get("device_id") or state.active_device_id
-        device = state.get_device(device_id)
-        if not device:
-            return jsonify({"success": False, "error": "Device not found"})
-
-        motor_id = data.get("motor_id")
-        responses, error = enable_clock_map(device, motor_id)
-        if error:
-            return jsonify({"success": False, "error": error})
-        return jsonify({"success": True, "responses": responses})
-
-    @app.route("/api/motor/sweep-test", methods=["POST"])
-    def api_sweep_test():
-        """Run motor sweep test."""
-        data = request.json or {}
-        device_id = data.get("device_id") or state.active_device_id
-        device = state.get_device(device_id)
-        if not device:
-            return jsonify({"success": False, "error": "Device not found"})
+    def motor_action_view(action):
+        """Build a view that runs action(device, motor_id) on a device."""
 
-        motor_id = data.get("motor_id")
-        responses, error = sweep_test(device, motor_id)
-        if error:
-            return jsonify({"success": False, "error": error})
-        return jsonify({"success": True, "responses": responses})
+        @with_device
+        def view(device, data):
+            responses, error = action(device, data.get("motor_id"))
+            if error:
+                return jsonify({"success": False, "error": error})
+            return jsonify({"success": True, "responses": responses})
 
-    @app.route("/api/motor/battery-usage", methods=["POST"])
-    def api_show_battery_usage():
-        """Show battery usage on motor display."""
-        data = request.json or {}
-        device_id = data.get("device_id") or state.active_device_id
-        device = state.get_device(device_id)
-        if not device:
-            return jsonify({"success": False, "error": "Device not found"})
+        return view
 
-        motor_id = data.get("motor_id")
-        responses, error = show_battery_usage(device, motor_id)
-        if error:
-            return jsonify({"success": False, "error": error})
-        return jsonify({"success": True, "responses": responses})
+    # Motor actions that only take an optional motor_id
+    for rule, endpoint, action in (
+        ("/api/motor/enable-clock", "api_enable_clock_map", enable_clock_map),
+        ("/api/motor/sweep-test", "api_sweep_test", sweep_test),
+        ("/api/motor/battery-usage", "api_show_battery_usage", show_battery_usage),
+    ):
+        app.add_url_rule(rule, endpoint, motor_action_view(action), methods=["POST"])
 
     @app.route("/api/command", methods=["POST"])
-    def api_command():
+    @with_device
+    def api_command(device, data):
         """Send raw command to device."""
-        data = request.json
-        device_id = data.get("device_id") or state.active_device_id
-        device = state.get_device(device_id)
-        if not device:
-            return jsonify({"success": False, "error": "Device not found"})
-
         command = data.get("command", "")
         if not command:
             return jsonify({"success": False, "error": "Missing command"})
@@ -594,14 +714,9 @@ def register_routes(app):
         return jsonify({"success": True, "responses": responses})
 
     @app.route("/api/terminal/input", methods=["POST"])
-    def api_terminal_input():
+    @with_device
+    def api_terminal_input(device, data):
         """Passthrough raw terminal input to device (fire-and-forget)."""
-        data = request.json
-        device_id = data.get("device_id") or state.active_device_id
-        device = state.get_device(device_id)
-        if not device:
-            return jsonify({"success": False, "error": "Device not found"})
-
         raw_data = data.get("data", "")
         if not raw_data:
             return jsonify({"success": False, "error": "Missing data"})
@@ -610,91 +725,130 @@ def register_routes(app):
             return jsonify({"success": False, "error": "Serial port not opened"})
 
         serial_write_async(device, raw_data)
-        return jsonify({"success": True})
+        return ok_response()
 
     @app.route("/api/log", methods=["GET"])
-    def api_log():
+    @with_device
+    def api_log(device, data):
         """Get serial communication log."""
-        device_id = request.args.get("device_id") or state.active_device_id
-        device = state.get_device(device_id)
-        if not device:
-            return jsonify({"success": False, "error": "Device not found"})
-
         since_id = request.args.get("since", 0, type=int)
-        log_snapshot = list(device.serial_log)
-        logs = [entry for entry in log_snapshot if entry["id"] >= since_id]
-        next_id = device.log_next_id
-        return jsonify({"success": True, "logs": logs, "next_index": next_id})
+        wait = min(request.args.get("wait", 0, type=float), LOG_WAIT_MAX)
+
+        if wait > 0 and since_id == device.log_next_id:
+            # Long poll: hold a caught-up client until the worker logs (or
+            # clears) something, instead of having it re-poll at a fixed rate
+            with device.log_cond:
+                device.log_cond.wait_for(
+                    lambda: device.log_next_id != since_id, timeout=wait
+                )
+
+        def take_snapshot():
+            log = device.serial_log
+            next_id = device.log_next_id
+            if since_id >= next_id > 0:
+                # Client is caught up: nothing to copy
+                return [], next_id
+            start = 0
+            if since_id > 0 and log:
+                # Log ids are consecutive, so the first new entry is at a
+                # fixed offset from the oldest one still kept
+                start = max(0, since_id - log[0]["id"])
+            return list(islice(log, start, None)), next_id
+
+        # Copy on the worker thread, which is the only writer of the log
+        result = {}
+
+        def do_snapshot():
+            result["snapshot"] = take_snapshot()
+
+        if run_in_device_worker(device, do_snapshot, timeout=0.5):
+            logs, next_id = result["snapshot"]
+        else:
+            logs, next_id = take_snapshot()
+
+        if (
+            msgpack is not None
+            and request.accept_mimetypes.best == "application/msgpack"
+        ):
+            # Binary variant for clients that ask for it: no repeated keys
+            # as text, and no JSON escaping of the log data
+            return app.response_class(
+                msgpack.packb(
+                    {"success": True, "logs": logs, "next_index": next_id},
+                    use_bin_type=True,
+                ),
+                mimetype="application/msgpack",
+            )
+
+        if len(logs) <= LOG_STREAM_THRESHOLD:
+            return jsonify({"success": True, "logs": logs, "next_index": next_id})
+
+        # Large backlog (e.g. first poll after reconnect): stream the entries
+        # in batches instead of encoding the whole log into one string
+        def generate():
+            yield '{"success":true,"logs":['
+            for i in range(0, len(logs), LOG_STREAM_BATCH):
+                batch = app.json.dumps(logs[i : i + LOG_STREAM_BATCH])[1:-1]
+                yield batch if i == 0 else "," + batch
+            yield f'],"next_index":{next_id}}}'
+
+        return app.response_class(generate(), mimetype="application/json")
 
     @app.route("/api/log/clear", methods=["POST"])
-    def api_log_clear():
+    @with_device
+    def api_log_clear(device, data):
         """Clear serial communication log."""
-        data = request.json or {}
-        device_id = data.get("device_id") or state.active_device_id
-        device = state.get_device(device_id)
-        if not device:
-            return jsonify({"success": False, "error": "Device not found"})
 
         def do_clear():
-            device.serial_log = []
+            device.serial_log.clear()
             device.log_next_id = 0
+            with device.log_cond:
+                device.log_cond.notify_all()
 
         if device.worker and device.worker.is_running():
             run_in_device_worker(device, do_clear, timeout=1.0)
         else:
             do_clear()
-        return jsonify({"success": True})
+        return ok_response()
 
     @app.route("/api/monitor/modes", methods=["GET"])
     def api_monitor_modes():
         """Get available monitoring modes."""
-        modes = [
-            {"value": "cpu-usage", "label": "CPU 占用率"},
-            {"value": "mem-usage", "label": "内存使用率"},
-        ]
-        if GPUtil is not None:
-            modes.append({"value": "gpu-usage", "label": "GPU 占用率"})
-        if sc is not None:
-            modes.append({"value": "audio-level", "label": "音频响度"})
-            modes.append({"value": "audio-left", "label": "音频 左声道"})
-            modes.append({"value": "audio-right", "label": "音频 右声道"})
-        return jsonify({"success": True, "modes": modes})
+        return app.response_class(monitor_modes_body, mimetype="application/json")
 
     @app.route("/api/monitor/config", methods=["POST"])
-    def api_monitor_config():
+    @with_device
+    def api_monitor_config(device, data):
         """Update dual-channel monitor configuration."""
-        data = request.json
-        device_id = data.get("device_id") or state.active_device_id
-        device = state.get_device(device_id)
-        if not device:
-            return jsonify({"success": False, "error": "Device not found"})
-
         if "mode_0" in data:
             device.monitor_mode_0 = data["mode_0"]
         if "mode_1" in data:
             device.monitor_mode_1 = data["mode_1"]
+        # Only touch the channel timers when a period actually changes
         if "period_0" in data:
-            device.period_0 = float(data["period_0"])
-            update_monitor_period(device, device.period_0, channel=0)
+            period_0 = float(data["period_0"])
+            if period_0 != device.period_0:
+                device.period_0 = period_0
+                update_monitor_period(device, period_0, channel=0)
         if "period_1" in data:
-            device.period_1 = float(data["period_1"])
-            update_monitor_period(device, device.period_1, channel=1)
+            period_1 = float(data["period_1"])
+            if period_1 != device.period_1:
+                device.period_1 = period_1
+                update_monitor_period(device, period_1, channel=1)
 
         # 同步 legacy period 为最小值（兼容）
-        device.period = min(device.period_0, device.period_1)
+        p0, p1 = device.period_0, device.period_1
+        min_period = p0 if p0 < p1 else p1
+        if min_period != device.period:
+            device.period = min_period
 
-        state.save_config()
-        return jsonify({"success": True})
+        state.mark_dirty()
+        return ok_response()
 
     @app.route("/api/monitor/start", methods=["POST"])
-    def api_monitor_start():
+    @with_device
+    def api_monitor_start(device, data):
         """Start monitoring mode."""
-        data = request.json
-        device_id = data.get("device_id") or state.active_device_id
-        device = state.get_device(device_id)
-        if not device:
-            return jsonify({"success": False, "error": "Device not found"})
-
         # 支持双通道模式配置
         mode_0 = data.get("mode_0", device.monitor_mode_0)
         mode_1 = data.get("mode_1", device.monitor_mode_1)
@@ -705,6 +859,12 @@ def register_routes(app):
             mode_0 = mode
             mode_1 = "none"
 
+        for channel_mode in (mode_0, mode_1):
+            if channel_mode and channel_mode not in _VALID_MONITOR_MODES:
+                return jsonify(
+                    {"success": False, "error": f"Invalid mode: {channel_mode}"}
+                )
+
         device.monitor_mode_0 = mode_0
         device.monitor_mode_1 = mode_1
 
@@ -724,64 +884,49 @@ def register_routes(app):
 
         device.auto_monitor = True
         device.auto_monitor_mode = f"{mode_0},{mode_1}"
-        state.save_config()
+        state.mark_dirty()
 
         return jsonify({"success": True, "mode_0": mode_0, "mode_1": mode_1})
 
     @app.route("/api/monitor/stop", methods=["POST"])
-    def api_monitor_stop():
+    @with_device
+    def api_monitor_stop(device, data):
         """Stop monitoring mode."""
-        data = request.json or {}
-        device_id = data.get("device_id") or state.active_device_id
-        device = state.get_device(device_id)
-        if not device:
-            return jsonify({"success": False, "error": "Device not found"})
-
         success, error = stop_monitor(device)
         if error:
             return jsonify({"success": False, "error": error})
 
         device.auto_monitor = False
-        state.save_config()
+        state.mark_dirty()
 
-        return jsonify({"success": True})
+        return ok_response()
 
     @app.route("/api/monitor/value", methods=["GET"])
-    def api_monitor_value():
+    @with_device
+    def api_monitor_value(device, data):
         """Get current monitor value."""
-        device_id = request.args.get("device_id") or state.active_device_id
-        device = state.get_device(device_id)
-        if not device:
-            return jsonify({"success": False, "error": "Device not found"})
-
         mode = request.args.get("mode", device.monitor_mode)
 
         if mode == "audio-level":
             if device.monitor_mode == "audio-level" and device.monitor_running:
-                return jsonify(
-                    {
-                        "success": True,
-                        "value": round(device.last_percent, 2),
-                        "mode": mode,
-                    }
-                )
+                return monitor_value_response(mode, device.last_percent)
             else:
                 return jsonify(
                     {"success": False, "error": "Audio monitoring not active"}
                 )
 
-        if mode == "cpu-usage":
-            value, error = get_cpu_usage()
-        elif mode == "mem-usage":
-            value, error = get_mem_usage()
-        elif mode == "gpu-usage":
-            value, error = get_gpu_usage()
-        else:
+        value = get_recent_sample(device, mode)
+        if value is not None:
+            return monitor_value_response(mode, value)
+
+        sample = _MONITOR_VALUE_FNS.get(mode)
+        if sample is None:
             return jsonify({"success": False, "error": "Invalid or no mode specified"})
 
+        value, error = sample()
         if error:
             return jsonify({"success": False, "error": error})
-        return jsonify({"success": True, "value": round(value, 2), "mode": mode})
+        return monitor_value_response(mode, round(value, 2))
 
     @app.route("/api/audio/devices", methods=["GET"])
     def api_audio_devices():
@@ -795,7 +940,7 @@ def register_routes(app):
     def api_audio_select():
         """Select audio input device."""
         logger = logging.getLogger(__name__)
-        data = request.json
+        data = request.get_json(silent=True) or {}
         logger.info(f"Audio select request: {data}")
         # Use serial_device_id to find the DutyCycle device, fallback to active device
         serial_device_id = data.get("serial_device_id") or state.active_device_id
@@ -808,7 +953,7 @@ def register_routes(app):
         audio_device_id = data.get("audio_device_id") or data.get("device_id")
         device.audio_device_id = audio_device_id if audio_device_id else None
         logger.info(f"Set audio_device_id to: {device.audio_device_id}")
-        state.save_config()
+        state.mark_dirty()
 
         if device.monitor_running and device.monitor_mode == "audio-level":
             stop_monitor(device)
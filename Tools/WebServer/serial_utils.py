@@ -9,13 +9,26 @@ Serial communication utilities for DutyCycle Web Server.
 Provides serial port operations with multi-device support.
 """
 
-import glob
 import logging
+import os
+import time
 
 import serial
 import serial.tools.list_ports
 
-from device_worker import start_worker, stop_worker
+try:
+    import pyudev
+except ImportError:
+    pyudev = None
+
+from device_worker import encode_write, start_worker, stop_worker
+
+# How long a port scan result is reused by scan_serial_ports_cached() (seconds)
+PORT_SCAN_TTL = 2.0
+
+# (monotonic scan time, ports) of the last scan; swapped as one tuple
+_port_scan_cache = (None, None)
+_hotplug_observer = None
 
 
 def _is_hidden_serial_device(device_path):
@@ -23,6 +36,19 @@ def _is_hidden_serial_device(device_path):
     return device_path.startswith("/dev/ttyS")
 
 
+def _scan_ch341_devices():
+    """List /dev/ttyCH341USB* nodes (one directory read, no glob pattern)."""
+    try:
+        with os.scandir("/dev") as entries:
+            return [
+                "/dev/" + entry.name
+                for entry in entries
+                if entry.name.startswith("ttyCH341USB")
+            ]
+    except OSError:
+        return []  # No /dev (e.g. Windows)
+
+
 def scan_serial_ports():
     """Scan for available serial ports."""
     ports = serial.tools.list_ports.comports()
@@ -33,7 +59,7 @@ def scan_serial_ports():
     ]
 
     # Also scan for CH341 USB serial devices which may not be detected by pyserial
-    ch341_devices = glob.glob("/dev/ttyCH341USB*")
+    ch341_devices = _scan_ch341_devices()
     existing_devices = {item["device"] for item in result}
     for dev in ch341_devices:
         if dev not in existing_devices and not _is_hidden_serial_device(dev):
@@ -42,6 +68,54 @@ def scan_serial_ports():
     return result
 
 
+def scan_serial_ports_cached():
+    """Scan for serial ports, reusing a result younger than PORT_SCAN_TTL.
+
+    Enumerating ports walks sysfs (or SetupAPI on Windows) and can take tens
+    of milliseconds; the UI may ask for the list repeatedly.
+    """
+    global _port_scan_cache
+    now = time.monotonic()
+    scanned_at, ports = _port_scan_cache
+    if scanned_at is None or now - scanned_at > PORT_SCAN_TTL:
+        ports = scan_serial_ports()
+        _port_scan_cache = (now, ports)
+    return ports
+
+
+def invalidate_port_scan():
+    """Make the next scan_serial_ports_cached() call rescan."""
+    global _port_scan_cache
+    _port_scan_cache = (None, None)
+
+
+def start_port_hotplug_monitor():
+    """Invalidate the port scan cache on tty add/remove events (needs pyudev).
+
+    Returns:
+        True if the monitor is running.
+    """
+    global _hotplug_observer
+    if _hotplug_observer is not None:
+        return True
+    if pyudev is None:
+        return False
+
+    logger = logging.getLogger(__name__)
+    try:
+        monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+        monitor.filter_by(subsystem="tty")
+        observer = pyudev.MonitorObserver(
+            monitor, callback=lambda device: invalidate_port_scan()
+        )
+        observer.start()
+    except Exception as e:
+        logger.warning(f"Serial port hotplug monitor unavailable: {e}")
+        return False
+    _hotplug_observer = observer
+    return True
+
+
 def serial_open(port, baudrate=115200, timeout=1):
     """Open a serial port."""
     try:
@@ -64,7 +138,7 @@ def serial_write(device, command, timeout=2.0):
     if worker is None or not worker.is_running():
         return None, "Device worker not started"
 
-    if not worker.enqueue_and_wait("write", command, timeout):
+    if not worker.enqueue_and_wait("write", encode_write(command), timeout):
         return None, "Command timeout"
 
     return [], None
@@ -74,7 +148,14 @@ def serial_write_async(device, command):
     """Queue a command for async serial write (fire-and-forget)."""
     worker = device.worker
     if worker is not None:
-        worker.enqueue("write", command)
+        worker.enqueue("write", encode_write(command))
+
+
+def serial_write_latest(device, key, command):
+    """Queue an async serial write that supersedes pending writes with the same key."""
+    worker = device.worker
+    if worker is not None:
+        worker.enqueue_latest(key, encode_write(command))
 
 
 def serial_write_direct(device, command):
@@ -87,16 +168,33 @@ def serial_write_direct(device, command):
     """
     logger = logging.getLogger(__name__)
     ser = device.ser
-    if ser is None or not ser.isOpen():
+    if ser is None:
         return
 
     try:
+        # No flush() or isOpen(): see DeviceWorker._serial_write_direct
         ser.write(command.encode())
-        ser.flush()
     except Exception as e:
         logger.warning(f"Serial write error: {e}")
 
 
+def serial_write_logged(device, command):
+    """
+    Direct serial write that is logged as TX (call from worker thread only).
+
+    Args:
+        device: DeviceState object
+        command: Command string to send
+
+    Returns:
+        True if the command was written.
+    """
+    worker = device.worker
+    if worker is None:
+        return False
+    return worker.write_direct(encode_write(command))
+
+
 def start_device_worker(device):
     """Start the worker thread for a device."""
     return start_worker(device)
@@ -9,14 +9,29 @@ Multi-device state management for DutyCycle Web Server.
 Supports multiple devices with independent connections and configurations.
 """
 
+import atexit
+import collections
 import json
 import logging
 import os
 import threading
+import time
+from operator import attrgetter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Module logger
+logger = logging.getLogger(__name__)
 
 # Config file path (relative to WebServer directory)
 CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
 
+# Delay before changes marked by mark_dirty() are written to CONFIG_FILE
+SAVE_DEBOUNCE_DELAY = 0.5  # seconds
+
 # Config version for migration support
 CONFIG_VERSION = 2
 
@@ -32,6 +47,7 @@ DEVICE_PERSISTENT_KEYS = [
     "period",
     "period_0",
     "period_1",
+    "write_period",
     "cmd_file",
     "cmd_file_enabled",
     "audio_db_min",
@@ -51,10 +67,107 @@ DEVICE_PERSISTENT_KEYS = [
     "threshold_duration",
 ]
 
+# Device keys stored at the top level of a v1 (single-device) config
+V1_CONFIG_KEYS = frozenset(
+    [
+        "port",
+        "baudrate",
+        "motor_max",
+        "motor_min",
+        "period",
+        "cmd_file",
+        "cmd_file_enabled",
+        "audio_db_min",
+        "audio_db_max",
+        "audio_device_id",
+        "auto_connect",
+        "auto_monitor",
+        "auto_monitor_mode",
+        "auto_sync_clock",
+        "last_sync_time",
+        "threshold_enable",
+        "threshold_mode",
+        "threshold_value",
+        "threshold_freq",
+        "threshold_duration",
+    ]
+)
+
+# Fetch all persistent values in one C call (see DeviceState.to_dict)
+_get_persistent_values = attrgetter(*DEVICE_PERSISTENT_KEYS)
+_PERSISTENT_KEY_SET = frozenset(DEVICE_PERSISTENT_KEYS)
+
 
 class DeviceState:
     """State container for a single device."""
 
+    # Fixed attribute set: fast attribute access, and typos raise instead of
+    # silently creating new attributes. Every slot is set in __init__.
+    __slots__ = (
+        "device_id",
+        "name",
+        # Serial connection
+        "ser",
+        "port",
+        "baudrate",
+        "timeout",
+        # Motor config
+        "motor_max",
+        "motor_min",
+        "motor_unit_0",
+        "motor_unit_1",
+        # Monitor state
+        "monitor_mode_0",
+        "monitor_mode_1",
+        "period_0",
+        "period_1",
+        "write_period",
+        "monitor_running",
+        "last_percent",
+        "last_percent_0",
+        "last_percent_1",
+        "last_samples",
+        "monitor_mode",
+        "period",
+        # Serial log
+        "serial_log",
+        "log_max_size",
+        "log_next_id",
+        "log_cond",
+        # Command file
+        "cmd_file",
+        "cmd_file_enabled",
+        # Audio
+        "audio_recorder",
+        "_audio_init_tried",
+        "_audio_cache",
+        "_status_cache",
+        "audio_db_min",
+        "audio_db_max",
+        "audio_device_id",
+        "audio_channel",
+        # Auto-restore
+        "auto_connect",
+        "auto_monitor",
+        "auto_monitor_mode",
+        "auto_sync_clock",
+        "last_sync_time",
+        "_last_sync_parsed",
+        "_last_sync_parsed_src",
+        # Threshold alarm
+        "threshold_enable",
+        "threshold_mode",
+        "threshold_value",
+        "threshold_freq",
+        "threshold_duration",
+        "last_alarm_time",
+        # Worker and timers
+        "worker",
+        "monitor_timer_0",
+        "monitor_timer_1",
+        "cmd_file_timer",
+    )
+
     def __init__(self, device_id, name="Device"):
         self.device_id = device_id
         self.name = name
@@ -76,17 +189,23 @@ class DeviceState:
         self.monitor_mode_1 = "none"  # CH1 monitor mode
         self.period_0 = 0.1  # CH0 sample period
         self.period_1 = 0.1  # CH1 sample period
+        self.write_period = 0  # Motor write period, 0: write every sample
         self.monitor_running = False
         self.last_percent = 0
+        self.last_samples = {}  # mode -> (value, monotonic time) from monitor
         self.audio_recorder = None
+        self._audio_init_tried = False  # Audio meter opened once per monitor start
+        self._audio_cache = None  # (timestamp, data) shared by both channels
+        self._status_cache = None  # (field values, /api/status body, ETag)
 
         # Legacy (for backward compatibility)
         self.monitor_mode = None
         self.period = 0.1
 
         # Serial log (per device)
-        self.serial_log = []
         self.log_max_size = 1000
+        self.serial_log = collections.deque(maxlen=self.log_max_size)
+        self.log_cond = threading.Condition()  # Notified when the log changes
         self.log_next_id = 0
 
         # Command file monitoring
@@ -109,6 +228,8 @@ class DeviceState:
         self.auto_monitor_mode = None
         self.auto_sync_clock = False
         self.last_sync_time = None
+        self._last_sync_parsed = None  # Parsed last_sync_time cache
+        self._last_sync_parsed_src = None
 
         # Threshold alarm settings
         self.threshold_enable = False
@@ -128,13 +249,12 @@ class DeviceState:
 
     def to_dict(self):
         """Export persistent config as dict."""
-        return {key: getattr(self, key) for key in DEVICE_PERSISTENT_KEYS}
+        return dict(zip(DEVICE_PERSISTENT_KEYS, _get_persistent_values(self)))
 
     def from_dict(self, data):
         """Import config from dict."""
-        for key in DEVICE_PERSISTENT_KEYS:
-            if key in data:
-                setattr(self, key, data[key])
+        for key in _PERSISTENT_KEY_SET.intersection(data):
+            setattr(self, key, data[key])
 
 
 class MultiDeviceState:
@@ -145,6 +265,16 @@ class MultiDeviceState:
         self.devices = {}  # device_id -> DeviceState
         self.active_device_id = None
 
+        # Debounced config saving (see mark_dirty)
+        self._save_lock = threading.Lock()
+        self._save_event = threading.Event()
+        self._save_thread = None
+        self._dirty = False
+        self._saved_config = None  # Bytes last read from / written to CONFIG_FILE
+        # Serializes save_config(): the writer thread and explicit flushes
+        # share the temp file and _saved_config
+        self._write_lock = threading.Lock()
+
         # Load config from file
         self.load_config()
 
@@ -192,9 +322,7 @@ class MultiDeviceState:
 
     def get_active_device(self):
         """Get the currently active device."""
-        if self.active_device_id:
-            return self.devices.get(self.active_device_id)
-        return None
+        return self.devices.get(self.active_device_id)
 
     def set_active_device(self, device_id):
         """Set the active device."""
@@ -207,17 +335,14 @@ class MultiDeviceState:
         """List all devices with their status."""
         result = []
         for device_id, device in self.devices.items():
-            connected = False
-            try:
-                connected = device.ser is not None and device.ser.isOpen()
-            except Exception:
-                pass
             result.append(
                 {
                     "id": device_id,
                     "name": device.name,
                     "port": device.port,
-                    "connected": connected,
+                    # Closing a port always sets device.ser to None, so this
+                    # is the connection state without probing the port
+                    "connected": device.ser is not None,
                     "monitoring": device.monitor_running,
                     "monitor_mode": device.monitor_mode,
                 }
@@ -226,14 +351,14 @@ class MultiDeviceState:
 
     def load_config(self):
         """Load configuration from JSON file."""
-        logger = logging.getLogger(__name__)
         if not os.path.exists(CONFIG_FILE):
             logger.info(f"Config file not found: {CONFIG_FILE}, using defaults")
             return
 
         try:
-            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                config = json.load(f)
+            with open(CONFIG_FILE, "rb") as f:
+                data = f.read()
+            config = orjson.loads(data) if orjson is not None else json.loads(data)
 
             version = config.get("version", 1)
 
@@ -243,31 +368,8 @@ class MultiDeviceState:
                 # Convert old single-device config to multi-device
                 device = DeviceState("device_0", "设备1")
                 # Load old keys directly
-                old_keys = [
-                    "port",
-                    "baudrate",
-                    "motor_max",
-                    "motor_min",
-                    "period",
-                    "cmd_file",
-                    "cmd_file_enabled",
-                    "audio_db_min",
-                    "audio_db_max",
-                    "audio_device_id",
-                    "auto_connect",
-                    "auto_monitor",
-                    "auto_monitor_mode",
-                    "auto_sync_clock",
-                    "last_sync_time",
-                    "threshold_enable",
-                    "threshold_mode",
-                    "threshold_value",
-                    "threshold_freq",
-                    "threshold_duration",
-                ]
-                for key in old_keys:
-                    if key in config:
-                        setattr(device, key, config[key])
+                for key in V1_CONFIG_KEYS.intersection(config):
+                    setattr(device, key, config[key])
                 self.devices["device_0"] = device
                 self.active_device_id = "device_0"
                 # Save migrated config
@@ -280,6 +382,7 @@ class MultiDeviceState:
                     device = DeviceState(device_id, device_data.get("name", device_id))
                     device.from_dict(device_data)
                     self.devices[device_id] = device
+                self._saved_config = data
 
             logger.info(f"Config loaded: {len(self.devices)} device(s)")
         except Exception as e:
@@ -287,23 +390,73 @@ class MultiDeviceState:
 
     def save_config(self):
         """Save configuration to JSON file."""
-        logger = logging.getLogger(__name__)
         try:
-            config = {
-                "version": CONFIG_VERSION,
-                "active_device_id": self.active_device_id,
-                "devices": {},
-            }
-            for device_id, device in self.devices.items():
-                config["devices"][device_id] = device.to_dict()
-
-            with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-                json.dump(config, f, indent=2, ensure_ascii=False)
-
-            logger.info(f"Config saved to {CONFIG_FILE}")
+            with self._write_lock:
+                config = {
+                    "version": CONFIG_VERSION,
+                    "active_device_id": self.active_device_id,
+                    "devices": {},
+                }
+                with self._lock:
+                    devices = list(self.devices.items())
+                for device_id, device in devices:
+                    config["devices"][device_id] = device.to_dict()
+
+                if orjson is not None:
+                    # Same layout as the json fallback below: 2-space indent,
+                    # raw UTF-8 (no \u escapes), trailing newline
+                    data = orjson.dumps(
+                        config, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE
+                    )
+                else:
+                    text = json.dumps(config, indent=2, ensure_ascii=False) + "\n"
+                    data = text.encode("utf-8")
+                if data == self._saved_config:
+                    return  # Nothing persistent changed since the last save
+                # Write a temp file and rename it over the config, so a crash
+                # mid-save leaves the previous config intact, never a truncated one
+                tmp_file = CONFIG_FILE + ".tmp"
+                with open(tmp_file, "wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, CONFIG_FILE)
+                self._saved_config = data
+
+                logger.info(f"Config saved to {CONFIG_FILE}")
         except Exception as e:
             logger.exception(f"Error saving config: {e}")
 
+    def mark_dirty(self):
+        """Schedule a save_config() shortly, coalescing repeated changes."""
+        with self._save_lock:
+            self._dirty = True
+            if self._save_thread is None:
+                # One long-lived writer instead of a timer thread per burst
+                self._save_thread = threading.Thread(
+                    target=self._config_writer, name="config-writer", daemon=True
+                )
+                self._save_thread.start()
+        self._save_event.set()
+
+    def _config_writer(self):
+        """Writer thread: save once per burst of mark_dirty() calls."""
+        while True:
+            self._save_event.wait()
+            time.sleep(SAVE_DEBOUNCE_DELAY)
+            self._save_event.clear()
+            self.flush_config()
+
+    def flush_config(self):
+        """Write pending changes marked by mark_dirty() now."""
+        with self._save_lock:
+            dirty = self._dirty
+            self._dirty = False
+        if dirty:
+            self.save_config()
+
 
 # Global multi-device state instance
 state = MultiDeviceState()
+# Write out a pending debounced save on exit (the writer thread is a daemon)
+atexit.register(state.flush_config)
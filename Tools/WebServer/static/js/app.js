@@ -532,7 +532,8 @@ async function pollSyncTime() {
 
 function startLogPolling() {
   if (logInterval) clearInterval(logInterval);
-  logInterval = setInterval(fetchLogs, 50); // 50ms轮询
+  // 长轮询: 无新日志时服务端最多挂起 1 秒, fetchingLogs 防止重叠请求
+  logInterval = setInterval(fetchLogs, 50);
 }
 
 async function fetchLogs() {
@@ -540,7 +541,7 @@ async function fetchLogs() {
   fetchingLogs = true;
 
   try {
-    const result = await api('/log?since=' + lastLogIndex);
+    const result = await api('/log?since=' + lastLogIndex + '&wait=1');
     if (result.success) {
       if (result.logs && result.logs.length > 0) {
         result.logs.forEach((entry) => {
@@ -30,6 +30,8 @@ def _clean_test_config():
     if os.path.exists(_test_config_file):
         os.remove(_test_config_file)
     yield
+    # Write out debounced saves now so they can't land in a later test
+    _state_module.state.flush_config()
     # Cleanup after test
     if os.path.exists(_test_config_file):
         os.remove(_test_config_file)
@@ -40,7 +42,10 @@ def mock_device():
     """Create a mock device for testing."""
     from state import DeviceState
 
-    device = DeviceState("test_device", "Test Device")
+    class RecordingDeviceState(DeviceState):
+        """DeviceState that can carry test-only attributes."""
+
+    device = RecordingDeviceState("test_device", "Test Device")
     device.motor_min = 0
     device.motor_max = 1000
     return device
@@ -191,6 +191,26 @@ class TestSetMotorValueAsync:
         result, error = set_motor_value(device, 500, async_mode=True)
         assert result is None
         assert error is None
+        device.worker.enqueue_latest.assert_called_once_with(
+            ("motor", 0),
+            (
+                "ctrl -c SET_MOTOR_VALUE -M 500\r\n",
+                b"ctrl -c SET_MOTOR_VALUE -M 500\r\n",
+            ),
+        )
+
+    def test_set_motor_value_async_keyed_per_motor(self):
+        """Test async writes for different motors do not replace each other."""
+        from device import set_motor_value
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        device.worker = MagicMock()
+
+        set_motor_value(device, 100, async_mode=True, motor_id=1)
+        set_motor_value(device, 200, async_mode=True)
+        keys = [c[0][0] for c in device.worker.enqueue_latest.call_args_list]
+        assert keys == [("motor", 1), ("motor", 0)]
 
     def test_set_motor_percent_async(self):
         """Test set_motor_percent in async mode."""
@@ -467,3 +487,15 @@ class TestSetMotorUnitCaseInsensitive:
 
         assert len(device._written_commands) > 0
         assert "--unit MINUTE" in device._written_commands[-1]
+
+
+class TestClockSetCommand:
+    """Test clock_set_command function."""
+
+    def test_clock_set_command_format(self):
+        """Test the clock command carries every date/time field."""
+        from datetime import datetime
+        from device import clock_set_command
+
+        cmd = clock_set_command(datetime(2025, 3, 4, 5, 6, 7))
+        assert cmd == "clock -c SET -y 2025 -m 3 -d 4 -H 5 -M 6 -S 7\r\n"
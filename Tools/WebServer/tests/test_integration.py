@@ -7,7 +7,9 @@
 Integration tests.
 """
 
+import sys
 import time
+import pytest
 from unittest.mock import MagicMock
 
 
@@ -37,8 +39,8 @@ class TestIntegration:
 
         t1 = tm.add(0.02, monitor_tick, "monitor")
         t2 = tm.add(0.1, cmd_file_tick, "cmd_file")
-        t1.reset(time.time())
-        t2.reset(time.time())
+        t1.reset(time.monotonic())
+        t2.reset(time.monotonic())
         worker.wake()
 
         time.sleep(0.25)
@@ -273,7 +275,28 @@ class TestDeviceWorkerClass:
         time.sleep(0.1)
 
         mock_serial.write.assert_called()
-        mock_serial.flush.assert_called()
+        mock_serial.flush.assert_not_called()
+
+        worker.stop()
+
+    def test_serial_write_direct_encoded_payload(self):
+        """Test pre-encoded writes send the bytes and log the text."""
+        from state import DeviceState
+        from device_worker import DeviceWorker, encode_write
+
+        device = DeviceState("test_serial_write_encoded", "Test")
+        mock_serial = MagicMock()
+        mock_serial.isOpen.return_value = True
+        device.ser = mock_serial
+
+        worker = DeviceWorker(device)
+        worker.start()
+        time.sleep(0.05)
+
+        worker.enqueue_and_wait("write", encode_write("test\r\n"), timeout=1.0)
+
+        mock_serial.write.assert_called_once_with(b"test\r\n")
+        assert device.serial_log[-1]["data"] == "test\r\n"
 
         worker.stop()
 
@@ -296,23 +319,25 @@ class TestDeviceWorkerClass:
         worker.stop()
 
     def test_serial_write_direct_not_open(self):
-        """Test _serial_write_direct when serial not open."""
+        """Test _serial_write_direct when the port was closed underneath."""
+        import serial
         from state import DeviceState
         from device_worker import DeviceWorker
 
         device = DeviceState("test_serial_write_not_open", "Test")
         mock_serial = MagicMock()
-        mock_serial.isOpen.return_value = False
+        mock_serial.write.side_effect = serial.PortNotOpenError()
+        mock_serial.in_waiting = 0
         device.ser = mock_serial
 
         worker = DeviceWorker(device)
         worker.start()
         time.sleep(0.05)
 
-        worker.enqueue("write", "test\r\n")
-        time.sleep(0.1)
-
-        mock_serial.write.assert_not_called()
+        # The failed write is caught and not logged as sent
+        assert worker.enqueue_and_wait("write", "test\r\n", timeout=1.0)
+        mock_serial.isOpen.assert_not_called()
+        assert not any(entry["dir"] == "TX" for entry in device.serial_log)
 
         worker.stop()
 
@@ -337,6 +362,48 @@ class TestDeviceWorkerClass:
 
         worker.stop()
 
+    def test_process_serial_rx_split_utf8(self):
+        """Test a UTF-8 character split across reads is decoded whole."""
+        from state import DeviceState
+        from device_worker import DeviceWorker
+
+        device = DeviceState("test_serial_rx_utf8", "Test")
+        mock_serial = MagicMock()
+        mock_serial.isOpen.return_value = True
+        mock_serial.in_waiting = 2
+        encoded = "温度".encode()
+        device.ser = mock_serial
+
+        worker = DeviceWorker(device)  # Not started: drive RX by hand
+        for chunk in (encoded[:2], encoded[2:4], encoded[4:]):
+            mock_serial.read.return_value = chunk
+            worker._process_serial_rx()
+
+        text = "".join(entry["data"] for entry in device.serial_log)
+        assert text == "温度"
+
+    def test_process_serial_rx_batches_lines(self):
+        """Test lines from one read are logged as one batch."""
+        from state import DeviceState
+        from device_worker import DeviceWorker
+
+        device = DeviceState("test_serial_rx_batch", "Test")
+        mock_serial = MagicMock()
+        mock_serial.isOpen.return_value = True
+        mock_serial.in_waiting = 12
+        mock_serial.read.return_value = b"a\r\nb\r\nc"
+        device.ser = mock_serial
+        device.log_next_id = 7
+
+        worker = DeviceWorker(device)
+        worker._process_serial_rx()
+
+        entries = list(device.serial_log)
+        assert [e["data"] for e in entries] == ["a\r\n", "b\r\n", "c"]
+        assert [e["id"] for e in entries] == [7, 8, 9]
+        assert len({e["time"] for e in entries}) == 1
+        assert device.log_next_id == 10
+
     def test_add_serial_log(self):
         """Test _add_serial_log method."""
         from state import DeviceState
@@ -382,3 +449,289 @@ class TestDeviceWorkerClass:
         assert worker.is_running()
 
         worker.stop()
+
+    def test_commands_run_in_order(self):
+        """Test queued commands from several threads all run, in FIFO order per thread."""
+        import threading
+        from state import DeviceState
+        from device_worker import DeviceWorker
+
+        device = DeviceState("test_fifo", "Test")
+        worker = DeviceWorker(device)
+        worker.start()
+        time.sleep(0.05)
+
+        results = {0: [], 1: []}
+
+        def producer(n):
+            for i in range(200):
+                worker.enqueue("call", lambda i=i: results[n].append(i))
+
+        threads = [threading.Thread(target=producer, args=(n,)) for n in results]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert worker.run_in_worker(lambda: None, timeout=1.0)
+
+        assert results[0] == list(range(200))
+        assert results[1] == list(range(200))
+        assert len(worker._cmd_queue) == 0
+
+        worker.stop()
+
+    def test_enqueue_latest_coalesces(self):
+        """Test pending keyed writes are replaced by newer ones."""
+        import threading
+        from state import DeviceState
+        from device_worker import DeviceWorker
+
+        device = DeviceState("test_latest", "Test")
+        device.ser = MagicMock()
+        device.ser.isOpen.return_value = True
+        worker = DeviceWorker(device)
+        assert worker.enqueue_latest("m", "x") is False
+
+        worker.start()
+        time.sleep(0.05)
+
+        # Hold the worker busy while several setpoints arrive
+        release = threading.Event()
+        worker.enqueue("call", release.wait)
+        for value in (1, 2, 3):
+            assert worker.enqueue_latest("m0", f"set {value}\r\n")
+        worker.enqueue_latest("m1", "other\r\n")
+        release.set()
+        worker.run_in_worker(lambda: None, timeout=1.0)
+        time.sleep(0.05)
+
+        written = sorted(c[0][0] for c in device.ser.write.call_args_list)
+        assert written == [b"other\r\n", b"set 3\r\n"]
+
+        worker.stop()
+
+    def test_enqueue_latest_keeps_fifo_order(self):
+        """Test an async setpoint is sent before a later sync command."""
+        import threading
+        from state import DeviceState
+        from device_worker import DeviceWorker
+        from serial_utils import serial_write, serial_write_latest
+
+        device = DeviceState("test_latest_order", "Test")
+        device.ser = MagicMock()
+        worker = DeviceWorker(device)
+        device.worker = worker
+        worker.start()
+        time.sleep(0.05)
+
+        # Hold the worker busy so both commands are pending together
+        release = threading.Event()
+        worker.enqueue("call", release.wait)
+        serial_write_latest(device, ("motor", 0), "set 1\r\n")
+        threading.Timer(0.05, release.set).start()
+        serial_write_latest(device, ("motor", 0), "set 2\r\n")
+        assert serial_write(device, "sweep\r\n", timeout=1.0) == ([], None)
+
+        written = [c[0][0] for c in device.ser.write.call_args_list]
+        assert written == [b"set 2\r\n", b"sweep\r\n"]
+        tx = [entry["data"] for entry in device.serial_log if entry["dir"] == "TX"]
+        assert tx == ["set 2\r\n", "sweep\r\n"]
+
+        worker.stop()
+
+    def test_enqueue_and_wait_reuses_event(self):
+        """Test a thread reuses its completion Event across calls."""
+        import device_worker
+        from state import DeviceState
+        from device_worker import DeviceWorker
+
+        worker = DeviceWorker(DeviceState("test_wait_event", "Test"))
+        worker.start()
+
+        assert worker.run_in_worker(lambda: None, timeout=1.0)
+        event = device_worker._wait_local.done_event
+        assert worker.run_in_worker(lambda: None, timeout=1.0)
+        assert device_worker._wait_local.done_event is event
+
+        worker.stop()
+
+    def test_enqueue_and_wait_timeout_drops_event(self):
+        """Test a late completion cannot finish the thread's next call."""
+        import threading
+        import device_worker
+        from state import DeviceState
+        from device_worker import DeviceWorker
+
+        worker = DeviceWorker(DeviceState("test_wait_timeout", "Test"))
+        worker.start()
+
+        release = threading.Event()
+        worker.enqueue("call", release.wait)
+        assert worker.run_in_worker(lambda: None, timeout=0.05) is False
+        assert device_worker._wait_local.done_event is None
+
+        release.set()
+        ran = []
+        assert worker.run_in_worker(lambda: ran.append(1), timeout=1.0)
+        assert ran == [1]
+
+        worker.stop()
+
+
+@pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="selector waker is Linux only"
+)
+class TestSelectorWaker:
+    """Test the selector-based worker wake-up."""
+
+    def test_set_and_clear(self):
+        """Test set() wakes wait() until clear() consumes it."""
+        from device_worker import SelectorWaker
+
+        waker = SelectorWaker()
+        try:
+            assert waker.wait(timeout=0) is False
+            waker.set()
+            waker.set()
+            assert waker.wait(timeout=1) is True
+            waker.clear()
+            assert waker.wait(timeout=0) is False
+        finally:
+            waker.close()
+
+    def test_wakes_on_serial_data(self):
+        """Test a readable serial fd wakes the waiter without set()."""
+        import os
+        from device_worker import SelectorWaker
+
+        read_fd, write_fd = os.pipe()
+        ser = MagicMock()
+        ser.fileno.return_value = read_fd
+        waker = SelectorWaker()
+        try:
+            waker.watch(ser)
+            assert waker.wait(timeout=0) is False
+            os.write(write_fd, b"RX")
+            assert waker.wait(timeout=1) is True
+
+            # Unwatching stops serial wake-ups
+            waker.watch(None)
+            assert waker.wait(timeout=0) is False
+        finally:
+            waker.close()
+            os.close(read_fd)
+            os.close(write_fd)
+
+    def test_suspend_stops_watching_port(self):
+        """Test a suspended port is not re-registered until replaced."""
+        import os
+        from device_worker import SelectorWaker
+
+        read_fd, write_fd = os.pipe()
+        ser = MagicMock()
+        ser.fileno.return_value = read_fd
+        waker = SelectorWaker()
+        try:
+            waker.watch(ser)
+            os.write(write_fd, b"RX")
+            assert waker.wait(timeout=1) is True
+            assert waker.serial_ready is True
+
+            waker.suspend(ser)
+            waker.watch(ser)
+            assert waker.wait(timeout=0) is False
+            assert waker.serial_ready is False
+
+            other = MagicMock()
+            other.fileno.return_value = read_fd
+            waker.watch(other)
+            assert waker.wait(timeout=1) is True
+        finally:
+            waker.close()
+            os.close(read_fd)
+            os.close(write_fd)
+
+    def test_ignores_unselectable_port(self):
+        """Test ports without a usable fileno fall back to timer wake-ups."""
+        from device_worker import SelectorWaker
+
+        waker = SelectorWaker()
+        try:
+            waker.watch(MagicMock())  # fileno() returns a MagicMock
+            assert waker.wait(timeout=0) is False
+        finally:
+            waker.close()
+
+    def test_worker_uses_selector_waker(self):
+        """Test the device worker wakes through the selector on Linux."""
+        from state import DeviceState
+        from device_worker import DeviceWorker, SelectorWaker
+
+        worker = DeviceWorker(DeviceState("test_waker", "Test"))
+        worker.start()
+        try:
+            assert isinstance(worker._wake_event, SelectorWaker)
+            assert worker.run_in_worker(lambda: None, timeout=1.0)
+        finally:
+            worker.stop()
+
+
+class TestLockWaker:
+    """Test the lock-based worker wake-up fallback."""
+
+    def test_event_semantics(self):
+        """Test set/wait/clear behave like threading.Event."""
+        from device_worker import LockWaker
+
+        waker = LockWaker()
+        assert waker.wait(timeout=0.01) is False
+        waker.set()
+        waker.set()  # Setting twice is harmless
+        assert waker.wait(timeout=0) is True
+        assert waker.wait(timeout=0) is True  # Stays set until cleared
+        waker.clear()
+        assert waker.wait(timeout=0.01) is False
+
+    def test_set_from_other_thread(self):
+        """Test set() wakes a waiter blocked in another thread."""
+        import threading
+        from device_worker import LockWaker
+
+        waker = LockWaker()
+        threading.Timer(0.02, waker.set).start()
+        start = time.monotonic()
+        assert waker.wait(timeout=2.0) is True
+        assert time.monotonic() - start < 1.0
+
+    def test_worker_fallback(self):
+        """Test the worker runs with the fallback waker."""
+        from unittest.mock import patch
+        from state import DeviceState
+        from device_worker import DeviceWorker, LockWaker
+
+        worker = DeviceWorker(DeviceState("test_lock_waker", "Test"))
+        with patch("device_worker.sys.platform", "win32"):
+            worker.start()
+        try:
+            assert isinstance(worker._wake_event, LockWaker)
+            assert worker.run_in_worker(lambda: None, timeout=1.0)
+        finally:
+            worker.stop()
+
+
+class TestLogTimestamp:
+    """Test serial log timestamp formatting."""
+
+    def test_format_matches_strftime(self):
+        """Test the fast formatter matches the HH:MM:SS.mmm layout."""
+        from unittest.mock import patch
+        from device_worker import _log_timestamp
+
+        for now, millis in (
+            (1700000000.0, "000"),
+            (1700000000.5, "500"),
+            (1700000061.25, "250"),
+        ):
+            with patch("device_worker.time.time", return_value=now):
+                clock = time.strftime("%H:%M:%S", time.localtime(now))
+                assert _log_timestamp() == f"{clock}.{millis}"
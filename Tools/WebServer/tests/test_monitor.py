@@ -190,50 +190,6 @@ class TestGetChannelValue:
         assert immediate is True
 
 
-class TestNeedsAudioInit:
-    """Test _needs_audio_init function."""
-
-    def test_no_audio_modes(self):
-        """Test when no audio modes are set."""
-        from monitor import _needs_audio_init
-        from state import DeviceState
-
-        device = DeviceState("test", "Test")
-        device.monitor_mode_0 = "cpu-usage"
-        device.monitor_mode_1 = "mem-usage"
-        assert _needs_audio_init(device) is False
-
-    def test_audio_level_mode_0(self):
-        """Test when audio-level is set on mode_0."""
-        from monitor import _needs_audio_init
-        from state import DeviceState
-
-        device = DeviceState("test", "Test")
-        device.monitor_mode_0 = "audio-level"
-        device.monitor_mode_1 = "none"
-        assert _needs_audio_init(device) is True
-
-    def test_audio_left_mode_1(self):
-        """Test when audio-left is set on mode_1."""
-        from monitor import _needs_audio_init
-        from state import DeviceState
-
-        device = DeviceState("test", "Test")
-        device.monitor_mode_0 = "none"
-        device.monitor_mode_1 = "audio-left"
-        assert _needs_audio_init(device) is True
-
-    def test_audio_right_mode(self):
-        """Test when audio-right is set."""
-        from monitor import _needs_audio_init
-        from state import DeviceState
-
-        device = DeviceState("test", "Test")
-        device.monitor_mode_0 = "audio-right"
-        device.monitor_mode_1 = "none"
-        assert _needs_audio_init(device) is True
-
-
 class TestCheckCmdFile:
     """Test check_cmd_file function."""
 
@@ -1320,3 +1276,399 @@ class TestGetAudioLevelChannelMono:
         value, error = get_audio_level_channel(device, "right")
         # Should fall back to channel 0
         assert error is None
+
+
+class TestChannelTickAudioPushOnChange:
+    """Test audio channel ticks only write the motor on change."""
+
+    @patch("monitor.serial_write_direct")
+    @patch("monitor._get_channel_value")
+    def test_audio_tick_skips_unchanged_value(self, mock_value, mock_write):
+        """Test repeated audio samples with the same value write once."""
+        from monitor import _create_channel_tick
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        device.monitor_running = True
+        device.monitor_mode_0 = "audio-level"
+        device.ser = MagicMock()
+        device.threshold_enable = False
+        mock_value.return_value = (0, None, True)
+
+        tick = _create_channel_tick(device, 0)
+        tick()
+        tick()
+        assert mock_write.call_count == 1
+
+        mock_value.return_value = (50, None, True)
+        tick()
+        assert mock_write.call_count == 2
+        assert "-M 500 -I" in mock_write.call_args[0][1]
+
+    @patch("monitor.serial_write_direct")
+    @patch("monitor._get_channel_value")
+    def test_non_audio_tick_always_writes(self, mock_value, mock_write):
+        """Test non-audio modes keep writing every tick."""
+        from monitor import _create_channel_tick
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        device.monitor_running = True
+        device.monitor_mode_0 = "cpu-usage"
+        device.ser = MagicMock()
+        device.threshold_enable = False
+        mock_value.return_value = (10, None, False)
+
+        tick = _create_channel_tick(device, 0)
+        tick()
+        tick()
+        assert mock_write.call_count == 2
+
+
+class TestChannelTickStableBackoff:
+    """Test channel timer backoff while the sampled value is static."""
+
+    @patch("monitor._get_channel_value")
+    def test_stable_value_stretches_interval(self, mock_value):
+        """Test interval doubles per stable tick up to 4x and resets on change."""
+        from monitor import _create_channel_tick
+        from state import DeviceState
+        from timer import Timer
+
+        device = DeviceState("test", "Test")
+        device.monitor_running = True
+        device.monitor_mode_0 = "cpu-usage"
+        device.period_0 = 0.5
+        device.threshold_enable = False
+        device.monitor_timer_0 = Timer(0.5, lambda: None, "monitor_ch0")
+        mock_value.return_value = (10, None, False)
+
+        tick = _create_channel_tick(device, 0)
+        tick()
+        assert device.monitor_timer_0.interval == 0.5
+        tick()
+        assert device.monitor_timer_0.interval == 1.0
+        tick()
+        tick()
+        tick()
+        assert device.monitor_timer_0.interval == 2.0
+
+        mock_value.return_value = (90, None, False)
+        tick()
+        assert device.monitor_timer_0.interval == 0.5
+
+    @patch("monitor._get_channel_value")
+    def test_audio_mode_keeps_period(self, mock_value):
+        """Test audio modes are never backed off."""
+        from monitor import _create_channel_tick
+        from state import DeviceState
+        from timer import Timer
+
+        device = DeviceState("test", "Test")
+        device.monitor_running = True
+        device.monitor_mode_1 = "audio-right"
+        device.period_1 = 0.1
+        device.monitor_timer_1 = Timer(0.1, lambda: None, "monitor_ch1")
+        mock_value.return_value = (0, None, True)
+
+        tick = _create_channel_tick(device, 1)
+        for _ in range(4):
+            tick()
+        assert device.monitor_timer_1.interval == 0.1
+
+
+class TestChannelTickErrorBackoff:
+    """Test channel timer backoff while the sampler reports errors."""
+
+    @patch("monitor._get_channel_value")
+    def test_errors_back_off_and_recover(self, mock_value):
+        """Test interval grows on errors, is capped, and resets on success."""
+        from monitor import _create_channel_tick, MONITOR_ERROR_BACKOFF_MAX
+        from state import DeviceState
+        from timer import Timer
+
+        device = DeviceState("test", "Test")
+        device.monitor_running = True
+        device.monitor_mode_0 = "gpu-usage"
+        device.period_0 = 0.5
+        device.threshold_enable = False
+        device.monitor_timer_0 = Timer(0.5, lambda: None, "monitor_ch0")
+        mock_value.return_value = (None, "No GPUs found", False)
+
+        tick = _create_channel_tick(device, 0)
+        tick()
+        assert device.monitor_timer_0.interval == 1.0
+        tick()
+        assert device.monitor_timer_0.interval == 2.0
+        for _ in range(5):
+            tick()
+        assert device.monitor_timer_0.interval == MONITOR_ERROR_BACKOFF_MAX
+
+        mock_value.return_value = (30, None, False)
+        tick()
+        assert device.monitor_timer_0.interval == 0.5
+
+    @patch("monitor._get_channel_value")
+    def test_error_backoff_never_shortens_period(self, mock_value):
+        """Test long configured periods are not cut down by the error cap."""
+        from monitor import _create_channel_tick
+        from state import DeviceState
+        from timer import Timer
+
+        device = DeviceState("test", "Test")
+        device.monitor_running = True
+        device.monitor_mode_0 = "gpu-usage"
+        device.period_0 = 10.0
+        device.threshold_enable = False
+        device.monitor_timer_0 = Timer(10.0, lambda: None, "monitor_ch0")
+        mock_value.return_value = (None, "No GPUs found", False)
+
+        tick = _create_channel_tick(device, 0)
+        tick()
+        assert device.monitor_timer_0.interval == 10.0
+
+
+class TestRmsToPercent:
+    """Test the lookup-table based RMS to percent mapping."""
+
+    def test_matches_log_mapping(self):
+        """Test table values stay within one bin of the exact dB mapping."""
+        import math
+        from monitor import _rms_to_percent
+
+        for rms in (0.00011, 0.001, 0.0123, 0.05, 0.1, 0.3162, 0.5, 0.99):
+            db = 20 * math.log10(rms)
+            expected = max(0, min(100, (db + 60) / 60 * 100))
+            assert abs(_rms_to_percent(rms, -60, 0) - expected) < 0.25
+
+    def test_clamps_range(self):
+        """Test silence and overload clamp to 0 and 100."""
+        from monitor import _rms_to_percent
+
+        assert _rms_to_percent(0, -60, 0) == 0
+        assert _rms_to_percent(0.00005, -60, 0) == 0
+        assert _rms_to_percent(1.0, -60, 0) == 100
+        assert _rms_to_percent(50.0, -60, 0) == 100
+
+    def test_custom_db_range(self):
+        """Test a different dB range builds its own table."""
+        from monitor import _rms_to_percent
+
+        assert abs(_rms_to_percent(0.01, -40, 0) - 0) < 0.25
+        assert abs(_rms_to_percent(0.1, -40, 0) - 50) < 0.25
+
+
+class TestChannelTickLazyAudioInit:
+    """Test the audio meter is opened by the first audio tick."""
+
+    @patch("monitor.init_audio_meter")
+    @patch("monitor._get_channel_value")
+    def test_audio_init_once_on_first_tick(self, mock_value, mock_init):
+        """Test init_audio_meter runs once even if it fails."""
+        from monitor import _create_channel_tick
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        device.monitor_running = True
+        device.monitor_mode_0 = "audio-left"
+        device.threshold_enable = False
+        device.audio_recorder = None
+        mock_value.return_value = (None, "Audio recorder not initialized", True)
+        mock_init.return_value = False
+
+        tick = _create_channel_tick(device, 0)
+        tick()
+        tick()
+        mock_init.assert_called_once_with(device)
+
+    @patch("monitor.init_audio_meter")
+    @patch("monitor._get_channel_value")
+    def test_audio_init_once_for_two_audio_channels(self, mock_value, mock_init):
+        """Test a failed init is not retried by the other audio channel."""
+        from monitor import _create_channel_tick
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        device.monitor_running = True
+        device.monitor_mode_0 = "audio-left"
+        device.monitor_mode_1 = "audio-right"
+        device.threshold_enable = False
+        device.audio_recorder = None
+        mock_value.return_value = (None, "Audio recorder not initialized", True)
+        mock_init.return_value = False
+
+        tick_0 = _create_channel_tick(device, 0)
+        tick_1 = _create_channel_tick(device, 1)
+        tick_0()
+        tick_1()
+        tick_0()
+        tick_1()
+        mock_init.assert_called_once_with(device)
+
+    @patch("monitor.init_audio_meter")
+    @patch("monitor._get_channel_value")
+    def test_no_audio_init_for_system_modes(self, mock_value, mock_init):
+        """Test non-audio channels never open the audio meter."""
+        from monitor import _create_channel_tick
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        device.monitor_running = True
+        device.monitor_mode_0 = "cpu-usage"
+        device.monitor_mode_1 = "none"
+        device.threshold_enable = False
+        mock_value.return_value = (10, None, False)
+
+        _create_channel_tick(device, 0)()
+        mock_init.assert_not_called()
+
+
+class TestGpuProbe:
+    """Test the cached GPU availability probe."""
+
+    def test_no_gpu_probed_once(self):
+        """Test get_gpu_usage stops calling GPUtil after a failed probe."""
+        import monitor
+
+        mock_gputil = MagicMock()
+        mock_gputil.getGPUs.return_value = []
+        with patch.object(monitor, "GPUtil", mock_gputil), patch.object(
+            monitor, "_gpu_available", None
+        ):
+            for _ in range(3):
+                value, error = monitor.get_gpu_usage()
+                assert value is None
+                assert error == "No GPUs found"
+            assert mock_gputil.getGPUs.call_count == 1
+
+    def test_gpu_available(self):
+        """Test get_gpu_usage reads the load when a GPU is present."""
+        import monitor
+
+        mock_gputil = MagicMock()
+        mock_gpu = MagicMock()
+        mock_gpu.load = 0.25
+        mock_gputil.getGPUs.return_value = [mock_gpu]
+        with patch.object(monitor, "GPUtil", mock_gputil), patch.object(
+            monitor, "_gpu_available", None
+        ):
+            assert monitor.get_gpu_usage() == (25.0, None)
+            assert monitor.probe_gpu() is True
+
+
+class TestChannelTickWritePeriod:
+    """Test averaging samples between motor writes."""
+
+    @patch("monitor.time.monotonic")
+    @patch("monitor.serial_write_direct")
+    @patch("monitor._get_channel_value")
+    def test_write_period_averages_samples(self, mock_value, mock_write, mock_time):
+        """Test samples within write_period are averaged into one write."""
+        from monitor import _create_channel_tick
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        device.monitor_running = True
+        device.monitor_mode_0 = "cpu-usage"
+        device.ser = MagicMock()
+        device.threshold_enable = False
+        device.write_period = 1.0
+
+        tick = _create_channel_tick(device, 0)
+        for now, percent in ((10.0, 20), (10.2, 40), (10.5, 60), (11.0, 80)):
+            mock_time.return_value = now
+            mock_value.return_value = (percent, None, False)
+            tick()
+
+        # First sample writes immediately, then 40/60/80 average to 60
+        assert mock_write.call_count == 2
+        assert "-M 200" in mock_write.call_args_list[0][0][1]
+        assert "-M 600" in mock_write.call_args_list[1][0][1]
+        assert device.last_percent_0 == 80
+
+    @patch("monitor.serial_write_direct")
+    @patch("monitor._get_channel_value")
+    def test_write_period_ignored_for_audio(self, mock_value, mock_write):
+        """Test audio modes keep writing at the sample rate."""
+        from monitor import _create_channel_tick
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        device.monitor_running = True
+        device.monitor_mode_0 = "audio-level"
+        device.ser = MagicMock()
+        device.threshold_enable = False
+        device.write_period = 10.0
+
+        tick = _create_channel_tick(device, 0)
+        mock_value.return_value = (10, None, True)
+        tick()
+        mock_value.return_value = (20, None, True)
+        tick()
+        assert mock_write.call_count == 2
+
+
+class TestRecentSample:
+    """Test publishing monitor samples for api_monitor_value."""
+
+    @patch("monitor.get_cpu_usage", return_value=(42.0, None))
+    def test_sampler_publishes_value(self, mock_cpu):
+        """Test non-audio samples are stored with a timestamp."""
+        from monitor import _get_channel_value
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        _get_channel_value(device, "cpu-usage")
+        value, timestamp = device.last_samples["cpu-usage"]
+        assert value == 42.0
+        assert timestamp > 0
+
+    @patch("monitor.get_cpu_usage", return_value=(None, "failed"))
+    def test_sampler_skips_errors(self, mock_cpu):
+        """Test failed samples are not published."""
+        from monitor import _get_channel_value
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        _get_channel_value(device, "cpu-usage")
+        assert "cpu-usage" not in device.last_samples
+
+    @patch("monitor.time.monotonic", return_value=100.0)
+    def test_recent_sample_freshness(self, mock_time):
+        """Test samples expire after the sampling channel's timer interval."""
+        from monitor import get_recent_sample
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        device.monitor_mode_1 = "mem-usage"
+        device.period_1 = 1.0
+        device.monitor_timer_1 = MagicMock(interval=1.0)
+        device.last_samples["mem-usage"] = (30.0, 99.5)
+        assert get_recent_sample(device, "mem-usage") is None
+
+        device.monitor_running = True
+        assert get_recent_sample(device, "mem-usage") == 30.0
+        assert get_recent_sample(device, "cpu-usage") is None
+
+        device.last_samples["mem-usage"] = (30.0, 98.0)
+        assert get_recent_sample(device, "mem-usage") is None
+
+        # Backed off channel: the sample stays fresh for the stretched interval
+        device.monitor_timer_1.interval = 4.0
+        assert get_recent_sample(device, "mem-usage") == 30.0
+
+        # Not sampled by any channel any more
+        device.last_samples["mem-usage"] = (30.0, 99.5)
+        device.monitor_mode_1 = "none"
+        assert get_recent_sample(device, "mem-usage") is None
+
+    @patch("monitor.get_cpu_usage", return_value=(33.33333, None))
+    def test_sampler_rounds_at_source(self, mock_cpu):
+        """Test sampled values are rounded once for display."""
+        from monitor import _get_channel_value
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        percent, error, immediate = _get_channel_value(device, "cpu-usage")
+        assert percent == 33.33
+        assert device.last_samples["cpu-usage"][0] == 33.33
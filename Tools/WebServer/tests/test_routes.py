@@ -132,15 +132,18 @@ class TestPortsRoute:
         assert "ports" in data
 
     @patch("serial_utils.serial.tools.list_ports.comports")
-    @patch("serial_utils.glob.glob")
-    def test_get_ports_filters_ttys(self, mock_glob, mock_comports, client):
+    @patch("serial_utils._scan_ch341_devices")
+    def test_get_ports_filters_ttys(self, mock_ch341, mock_comports, client):
         """Test get ports response does not include /dev/ttyS* devices."""
+        from serial_utils import invalidate_port_scan
+
         mock_comports.return_value = [
             MagicMock(device="/dev/ttyUSB0", description="USB Serial"),
             MagicMock(device="/dev/ttyS2", description="Legacy UART"),
             MagicMock(device="/dev/ttyACM0", description="CDC ACM"),
         ]
-        mock_glob.return_value = ["/dev/ttyCH341USB0"]
+        mock_ch341.return_value = ["/dev/ttyCH341USB0"]
+        invalidate_port_scan()
 
         response = client.get("/api/ports")
         assert response.status_code == 200
@@ -212,6 +215,7 @@ class TestConfigRoute:
                     "period": 0.1,
                     "period_0": 0.1,
                     "period_1": 0.2,
+                    "write_period": 1.0,
                     "cmd_file": "/tmp/cmd.txt",
                     "cmd_file_enabled": True,
                     "audio_db_min": -60,
@@ -339,6 +343,16 @@ class TestMonitorValueRoute:
         data = response.get_json()
         assert data["success"] is True
 
+    @patch("routes.get_recent_sample", return_value=12.35)
+    def test_get_monitor_value_uses_recent_sample(self, mock_recent, client):
+        """Test a fresh monitor sample is returned without re-sampling."""
+        mock_cpu = MagicMock()
+        with patch.dict("routes._MONITOR_VALUE_FNS", {"cpu-usage": mock_cpu}):
+            response = client.get("/api/monitor/value?mode=cpu-usage")
+        data = response.get_json()
+        assert data == {"success": True, "value": 12.35, "mode": "cpu-usage"}
+        mock_cpu.assert_not_called()
+
     def test_get_monitor_value_invalid_mode(self, client):
         """Test get monitor value with invalid mode."""
         response = client.get("/api/monitor/value?mode=invalid")
@@ -414,6 +428,20 @@ class TestLogRoute:
         data = response.get_json()
         assert data["success"] is True
 
+    def test_clear_log_keeps_bounded_deque(self, client):
+        """Test clearing empties the log in place, keeping its bound."""
+        from state import state
+
+        device = state.get_active_device()
+        log = device.serial_log
+        log.append({"id": 0, "time": "00:00:00.000", "dir": "TX", "data": "x"})
+        client.post(
+            "/api/log/clear", data=json.dumps({}), content_type="application/json"
+        )
+        assert device.serial_log is log
+        assert len(log) == 0
+        assert log.maxlen == device.log_max_size
+
     def test_clear_log_device_not_found(self, client):
         """Test clear log device not found."""
         response = client.post(
@@ -776,59 +804,6 @@ class TestSetupClockSyncTimer:
         assert timer_names.count("clock_sync") == 1
 
 
-class TestGetDeviceFromRequest:
-    """Test get_device_from_request function."""
-
-    def test_get_device_from_request_with_query_param(self, app):
-        """Test get_device_from_request with device_id query param."""
-        from routes import get_device_from_request
-        from state import state
-
-        # Get first device ID
-        device_id = list(state.devices.keys())[0]
-
-        # Use POST with JSON content type to avoid 415 error
-        with app.test_request_context(
-            f"/?device_id={device_id}",
-            method="POST",
-            content_type="application/json",
-            data="{}",
-        ):
-            device = get_device_from_request()
-            assert device is not None
-            assert device.device_id == device_id
-
-    def test_get_device_from_request_with_json(self, app):
-        """Test get_device_from_request with JSON body."""
-        from routes import get_device_from_request
-        from state import state
-
-        # Get first device ID
-        device_id = list(state.devices.keys())[0]
-
-        with app.test_request_context(
-            "/",
-            method="POST",
-            data=json.dumps({"device_id": device_id}),
-            content_type="application/json",
-        ):
-            device = get_device_from_request()
-            assert device is not None
-            assert device.device_id == device_id
-
-    def test_get_device_from_request_default(self, app):
-        """Test get_device_from_request returns active device when no device_id."""
-        from routes import get_device_from_request
-        from state import state
-
-        with app.test_request_context(
-            "/", method="POST", content_type="application/json", data="{}"
-        ):
-            device = get_device_from_request()
-            assert device is not None
-            assert device.device_id == state.active_device_id
-
-
 class TestDeleteDeviceRoute:
     """Test delete device API route."""
 
@@ -919,6 +894,24 @@ class TestMonitorStartRoute:
             content_type="application/json",
         )
 
+    @patch("routes.start_monitor")
+    def test_monitor_start_invalid_mode(self, mock_start, client):
+        """Test unknown channel modes are rejected before starting."""
+        from state import state
+
+        device = state.get_active_device()
+        saved = device.monitor_mode_1
+        response = client.post(
+            "/api/monitor/start",
+            data=json.dumps({"mode_0": "cpu-usage", "mode_1": "bogus"}),
+            content_type="application/json",
+        )
+        data = response.get_json()
+        assert data["success"] is False
+        assert "bogus" in data["error"]
+        assert device.monitor_mode_1 == saved
+        mock_start.assert_not_called()
+
     def test_monitor_start_device_not_found(self, client):
         """Test monitor start device not found."""
         response = client.post(
@@ -1218,12 +1211,12 @@ class TestClockSyncTimerCallback:
                 timer.callback()
                 break
 
-    @patch("routes.serial_write_direct")
+    @patch("routes.serial_write_logged", return_value=True)
     @patch("routes.state")
-    def test_clock_sync_callback_uses_serial_write_direct(
+    def test_clock_sync_callback_uses_serial_write_logged(
         self, mock_state, mock_write_direct
     ):
-        """Test clock sync callback uses serial_write_direct (not serial_write)."""
+        """Test clock sync callback uses serial_write_logged (not serial_write)."""
         from routes import setup_clock_sync_timer
         from state import DeviceState
         from timer import TimerManager
@@ -1246,14 +1239,14 @@ class TestClockSyncTimerCallback:
                 timer.callback()
                 break
 
-        # Should call serial_write_direct, not serial_write
+        # Should call serial_write_logged, not serial_write
         mock_write_direct.assert_called_once()
         cmd = mock_write_direct.call_args[0][1]
         assert "clock -c SET" in cmd
         assert device.last_sync_time is not None
-        mock_state.save_config.assert_called()
+        mock_state.mark_dirty.assert_called()
 
-    @patch("routes.serial_write_direct")
+    @patch("routes.serial_write_logged", return_value=True)
     @patch("routes.state")
     def test_clock_sync_callback_expired_sync_triggers(
         self, mock_state, mock_write_direct
@@ -1284,6 +1277,37 @@ class TestClockSyncTimerCallback:
 
         mock_write_direct.assert_called_once()
 
+    @patch("routes.serial_write_logged", return_value=False)
+    @patch("routes.state")
+    def test_clock_sync_callback_failed_write_not_recorded(
+        self, mock_state, mock_write_direct
+    ):
+        """Test a failed sync write leaves last_sync_time unset."""
+        from routes import setup_clock_sync_timer
+        from state import DeviceState
+        from timer import TimerManager
+
+        device = DeviceState("test", "Test")
+        device.auto_sync_clock = True
+        device.ser = MagicMock()
+        device.last_sync_time = None
+
+        mock_worker = MagicMock()
+        mock_tm = TimerManager()
+        mock_worker.get_timer_manager.return_value = mock_tm
+        device.worker = mock_worker
+
+        setup_clock_sync_timer(device)
+
+        for timer in mock_tm.timers:
+            if timer.name == "clock_sync":
+                timer.callback()
+                break
+
+        mock_write_direct.assert_called_once()
+        assert device.last_sync_time is None
+        mock_state.mark_dirty.assert_not_called()
+
 
 class TestRemoveDeviceWithMonitor:
     """Test remove device with monitor running."""
@@ -1305,22 +1329,675 @@ class TestRemoveDeviceWithMonitor:
         assert data["success"] is True
 
 
-class TestStatusRouteSerialException:
-    """Test status route with serial exception."""
+class TestStatusRouteConnected:
+    """Test status route connection state."""
 
-    def test_status_serial_exception(self, client):
-        """Test status when serial raises exception."""
+    def test_status_connected_without_probe(self, client):
+        """Test connected comes from device.ser without calling isOpen()."""
         from state import state as app_state
 
         device = app_state.get_active_device()
         mock_ser = MagicMock()
-        mock_ser.isOpen.side_effect = Exception("Serial error")
         device.ser = mock_ser
 
         response = client.get("/api/status")
         data = response.get_json()
         assert data["success"] is True
+        assert data["connected"] is True
+        mock_ser.isOpen.assert_not_called()
+
+        device.ser = None
+        data = client.get("/api/status").get_json()
         assert data["connected"] is False
 
         # Cleanup
         device.ser = None
+
+
+class TestJsonProvider:
+    """Test the orjson-backed JSON provider."""
+
+    def test_provider_installed(self, app):
+        """Test the app uses OrjsonProvider when orjson is available."""
+        from routes import OrjsonProvider, orjson
+
+        if orjson is None:
+            pytest.skip("orjson not installed")
+        assert isinstance(app.json, OrjsonProvider)
+
+    def test_jsonify_roundtrip(self, app):
+        """Test jsonify encodes int keys and unicode."""
+        from flask import jsonify
+
+        with app.app_context():
+            response = jsonify({"percent": 12.5, 1: "设备1"})
+        assert response.mimetype == "application/json"
+        data = json.loads(response.get_data(as_text=True))
+        assert data == {"percent": 12.5, "1": "设备1"}
+
+    def test_request_body_parsed_with_orjson(self, app):
+        """Test request JSON goes through the provider and bad JSON is silent."""
+        from routes import orjson
+
+        if orjson is None:
+            pytest.skip("orjson not installed")
+        with app.test_request_context(
+            "/", method="POST", data='{"a": [1, 2]}', content_type="application/json"
+        ):
+            from flask import request
+
+            with patch.object(orjson, "loads", wraps=orjson.loads) as mock_loads:
+                assert request.get_json() == {"a": [1, 2]}
+                assert request.get_json() == {"a": [1, 2]}
+            mock_loads.assert_called_once()
+
+        with app.test_request_context(
+            "/", method="POST", data="{bad", content_type="application/json"
+        ):
+            from flask import request
+
+            assert request.get_json(silent=True) is None
+
+    def test_fallback_provider_compact(self):
+        """Test the stdlib provider emits compact, unsorted output."""
+        from flask import Flask, jsonify
+        import routes
+
+        app = Flask(__name__)
+        app.debug = True
+        with patch.object(routes, "orjson", None):
+            routes.register_routes(app)
+        with app.app_context():
+            response = jsonify({"b": 1, "a": [1, 2]})
+        assert response.get_data(as_text=True).strip() == '{"b":1,"a":[1,2]}'
+
+    def test_jsonify_numpy_values(self, app):
+        """Test numpy scalars from the audio meter encode as numbers."""
+        from flask import jsonify
+        from routes import orjson
+
+        np = pytest.importorskip("numpy")
+        if orjson is None:
+            pytest.skip("orjson not installed")
+        with app.app_context():
+            response = jsonify({"value": np.float32(1.5), "levels": np.arange(3)})
+        data = json.loads(response.get_data(as_text=True))
+        assert data == {"value": 1.5, "levels": [0, 1, 2]}
+
+
+class TestCachedStaticRoutes:
+    """Test constant responses are encoded once at registration."""
+
+    def test_monitor_modes_cached(self, client):
+        """Test repeated monitor mode requests return identical bodies."""
+        from routes import get_available_monitor_modes
+
+        first = client.get("/api/monitor/modes")
+        second = client.get("/api/monitor/modes")
+        assert first.data == second.data
+        assert first.mimetype == "application/json"
+        assert first.get_json()["modes"] == get_available_monitor_modes()
+
+
+class TestClockSyncScheduling:
+    """Test the clock sync timer re-checks the wall-clock deadline."""
+
+    def _setup(self, device):
+        from routes import setup_clock_sync_timer
+        from timer import TimerManager
+
+        mock_worker = MagicMock()
+        tm = TimerManager()
+        mock_worker.get_timer_manager.return_value = tm
+        device.worker = mock_worker
+        setup_clock_sync_timer(device)
+        return next(t for t in tm.timers if t.name == "clock_sync")
+
+    def test_reschedules_to_remaining_time(self):
+        """Test a sync due within the hour schedules the check at the 24h mark."""
+        from datetime import datetime, timedelta
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        device.auto_sync_clock = True
+        device.ser = MagicMock()
+        device.last_sync_time = (
+            datetime.now() - timedelta(hours=23, minutes=30)
+        ).isoformat()
+
+        timer = self._setup(device)
+        timer.callback()
+        assert 1800 - 60 < timer.interval <= 1800
+
+    def test_interval_capped_at_check_interval(self):
+        """Test far-off deadlines are re-checked hourly (suspend, future time)."""
+        from datetime import datetime, timedelta
+        from routes import CLOCK_SYNC_CHECK_INTERVAL
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        device.auto_sync_clock = True
+        device.ser = MagicMock()
+        device.last_sync_time = (datetime.now() - timedelta(hours=20)).isoformat()
+
+        timer = self._setup(device)
+        timer.callback()
+        assert timer.interval == CLOCK_SYNC_CHECK_INTERVAL
+
+        # A last sync in the future must not push the check past the cap
+        device.last_sync_time = (datetime.now() + timedelta(days=2)).isoformat()
+        timer.callback()
+        assert timer.interval == CLOCK_SYNC_CHECK_INTERVAL
+
+    @patch("routes.serial_write_logged", return_value=True)
+    @patch("routes.state")
+    def test_sync_schedules_next_check(self, mock_state, mock_write_direct):
+        """Test a performed sync schedules the next check an hour later."""
+        from routes import CLOCK_SYNC_CHECK_INTERVAL
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        device.auto_sync_clock = True
+        device.ser = MagicMock()
+        device.last_sync_time = None
+
+        timer = self._setup(device)
+        timer.callback()
+        mock_write_direct.assert_called_once()
+        assert timer.interval == CLOCK_SYNC_CHECK_INTERVAL
+
+    def test_no_serial_disables_timer(self):
+        """Test the timer is disabled while disconnected."""
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        device.auto_sync_clock = True
+        device.ser = None
+
+        timer = self._setup(device)
+        timer.callback()
+        assert timer.enabled is False
+
+    @patch("routes.serial_write_logged", return_value=False)
+    @patch("routes.state")
+    def test_failed_write_halves_retry(self, mock_state, mock_write_direct):
+        """Test retries shrink while the sync write fails, down to the minimum."""
+        from routes import CLOCK_SYNC_CHECK_INTERVAL, CLOCK_SYNC_RETRY_MIN
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        device.auto_sync_clock = True
+        device.ser = MagicMock()
+        device.last_sync_time = None
+
+        timer = self._setup(device)
+        timer.callback()
+        assert timer.interval == CLOCK_SYNC_CHECK_INTERVAL / 2
+        for _ in range(10):
+            timer.callback()
+        assert timer.interval == CLOCK_SYNC_RETRY_MIN
+        assert timer.enabled is True
+
+    def test_disabled_stops_timer(self):
+        """Test the timer is disabled while auto sync is off."""
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        device.auto_sync_clock = False
+
+        timer = self._setup(device)
+        timer.callback()
+        assert timer.enabled is False
+
+
+class TestParsedSyncTime:
+    """Test memoized parsing of last_sync_time."""
+
+    def test_parse_once_and_invalidate(self):
+        """Test the parsed value is reused until the string changes."""
+        from datetime import datetime
+        from routes import _parsed_sync_time
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        assert _parsed_sync_time(device) is None
+
+        device.last_sync_time = "2025-01-02T03:04:05"
+        first = _parsed_sync_time(device)
+        assert first == datetime(2025, 1, 2, 3, 4, 5)
+        assert _parsed_sync_time(device) is first
+
+        device.last_sync_time = "invalid-time-format"
+        assert _parsed_sync_time(device) is None
+
+    def test_record_sync_time(self):
+        """Test recording a sync primes the parse cache."""
+        from datetime import datetime
+        from routes import _parsed_sync_time, _record_sync_time
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        now = datetime(2025, 6, 1, 12, 0, 0)
+        _record_sync_time(device, now)
+        assert device.last_sync_time == now.isoformat()
+        assert _parsed_sync_time(device) is now
+
+
+class TestWithDevice:
+    """Test device resolution shared by the device routes."""
+
+    def test_not_found_body(self, client):
+        """Test unknown devices get the shared not-found response."""
+        response = client.get("/api/status?device_id=nonexistent")
+        assert response.status_code == 200
+        assert response.get_json() == {
+            "success": False,
+            "error": "Device not found",
+        }
+
+    def test_query_param_on_post(self, client):
+        """Test POST routes also accept device_id as a query parameter."""
+        response = client.post(
+            "/api/log/clear?device_id=nonexistent",
+            data=json.dumps({}),
+            content_type="application/json",
+        )
+        assert response.get_json()["success"] is False
+
+    def test_post_without_body_uses_active_device(self, client):
+        """Test POST routes without a JSON body fall back to the active device."""
+        response = client.post("/api/log/clear")
+        assert response.get_json()["success"] is True
+
+
+class TestLogSince:
+    """Test incremental log polling."""
+
+    def test_since_returns_new_entries(self, client):
+        """Test only entries with id >= since are returned."""
+        from state import state
+
+        device = state.get_active_device()
+        saved = device.serial_log
+        device.serial_log = [
+            {"id": i, "time": "00:00:00.000", "dir": "RX", "data": str(i)}
+            for i in range(10, 20)
+        ]
+        try:
+            data = client.get("/api/log?since=15").get_json()
+            assert [e["id"] for e in data["logs"]] == [15, 16, 17, 18, 19]
+            data = client.get("/api/log?since=5").get_json()
+            assert len(data["logs"]) == 10
+            data = client.get("/api/log?since=20").get_json()
+            assert data["logs"] == []
+        finally:
+            device.serial_log = saved
+
+    def test_caught_up_skips_search(self, client):
+        """Test a poll at next_index returns nothing without searching."""
+        from state import state
+
+        device = state.get_active_device()
+        saved = device.serial_log, device.log_next_id
+        device.serial_log = [
+            {"id": i, "time": "00:00:00.000", "dir": "RX", "data": str(i)}
+            for i in range(10, 20)
+        ]
+        device.log_next_id = 20
+        try:
+            with patch("routes.islice") as mock_islice:
+                data = client.get("/api/log?since=20").get_json()
+            assert data["logs"] == []
+            assert data["next_index"] == 20
+            mock_islice.assert_not_called()
+        finally:
+            device.serial_log, device.log_next_id = saved
+
+    def test_wait_returns_when_entry_logged(self, client):
+        """Test a caught-up long poll returns as soon as an entry is logged."""
+        import threading
+        import time
+        from device_worker import DeviceWorker
+        from state import state
+
+        device = state.get_active_device()
+        next_id = device.log_next_id
+        logger = threading.Timer(
+            0.1, DeviceWorker(device)._add_serial_log, args=("RX", "hello")
+        )
+        start = time.monotonic()
+        logger.start()
+        data = client.get(f"/api/log?since={next_id}&wait=3").get_json()
+        assert time.monotonic() - start < 2
+        assert [e["data"] for e in data["logs"]] == ["hello"]
+        assert data["next_index"] == next_id + 1
+
+    def test_wait_times_out(self, client):
+        """Test a long poll with nothing new returns empty after the wait."""
+        import time
+        from state import state
+
+        device = state.get_active_device()
+        next_id = device.log_next_id
+        start = time.monotonic()
+        data = client.get(f"/api/log?since={next_id}&wait=0.1").get_json()
+        assert time.monotonic() - start >= 0.1
+        assert data["logs"] == []
+        assert data["next_index"] == next_id
+
+    def test_snapshot_taken_on_worker(self, client):
+        """Test the log snapshot is taken through the device worker."""
+        from state import state
+
+        calls = []
+
+        def fake_run(device, func, timeout=2.0):
+            calls.append(device)
+            func()
+            return True
+
+        device = state.get_active_device()
+        saved = device.serial_log
+        device.serial_log = [
+            {"id": 0, "time": "00:00:00.000", "dir": "TX", "data": "x"}
+        ]
+        try:
+            with patch("routes.run_in_device_worker", side_effect=fake_run):
+                data = client.get("/api/log").get_json()
+            assert calls == [device]
+            assert [e["id"] for e in data["logs"]] == [0]
+        finally:
+            device.serial_log = saved
+
+
+class TestLogMsgpack:
+    """Test the optional msgpack variant of api_log."""
+
+    def test_msgpack_when_accepted(self, client):
+        """Test a client accepting msgpack gets a packed body."""
+        fake = MagicMock()
+        fake.packb.return_value = b"\x82packed"
+        with patch("routes.msgpack", fake):
+            response = client.get("/api/log", headers={"Accept": "application/msgpack"})
+        assert response.mimetype == "application/msgpack"
+        assert response.data == b"\x82packed"
+        payload = fake.packb.call_args[0][0]
+        assert payload["success"] is True
+        assert "logs" in payload and "next_index" in payload
+
+    def test_json_by_default(self, client):
+        """Test JSON is returned without the Accept header or the module."""
+        fake = MagicMock()
+        with patch("routes.msgpack", fake):
+            response = client.get("/api/log")
+        assert response.mimetype == "application/json"
+        fake.packb.assert_not_called()
+
+        with patch("routes.msgpack", None):
+            response = client.get("/api/log", headers={"Accept": "application/msgpack"})
+        assert response.mimetype == "application/json"
+
+
+class TestStatusFields:
+    """Test api_status field layout."""
+
+    def test_status_contains_all_fields(self, client):
+        """Test every declared status field is present."""
+        from routes import STATUS_FIELDS
+
+        data = client.get("/api/status").get_json()
+        assert data["success"] is True
+        for key in STATUS_FIELDS + (
+            "device_name",
+            "connected",
+            "last_percent",
+            "last_percent_0",
+            "last_percent_1",
+        ):
+            assert key in data
+
+    def test_status_body_reused_until_changed(self, client, app):
+        """Test the encoded body is cached and rebuilt when a value changes."""
+        from state import state
+
+        device = state.get_active_device()
+        saved = device.motor_max, device.last_percent_0
+        try:
+            first = client.get("/api/status").data
+            with patch.object(app.json, "dumps") as mock_dumps:
+                assert client.get("/api/status").data == first
+                mock_dumps.assert_not_called()
+
+            device.last_percent_0 = 42.0
+            data = client.get("/api/status").get_json()
+            assert data["last_percent_0"] == 42.0
+            device.motor_max = 1234
+            assert client.get("/api/status").get_json()["motor_max"] == 1234
+        finally:
+            device.motor_max, device.last_percent_0 = saved
+
+
+class TestConditionalPolling:
+    """Test ETag / If-None-Match handling on polled endpoints."""
+
+    def test_status_not_modified(self, client):
+        """Test an unchanged status is answered with an empty 304."""
+        from state import state
+
+        first = client.get("/api/status")
+        etag = first.headers["ETag"]
+        assert etag.startswith('W/"')
+
+        second = client.get("/api/status", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.data == b""
+
+        device = state.get_active_device()
+        saved = device.motor_max
+        device.motor_max = saved + 1
+        try:
+            third = client.get("/api/status", headers={"If-None-Match": etag})
+            assert third.status_code == 200
+            assert third.headers["ETag"] != etag
+        finally:
+            device.motor_max = saved
+
+    @patch.dict("routes._MONITOR_VALUE_FNS", {"cpu-usage": MagicMock()})
+    @patch("routes.get_recent_sample", return_value=None)
+    def test_monitor_value_not_modified(self, mock_recent, client):
+        """Test the monitor value ETag follows the rounded value."""
+        from routes import _MONITOR_VALUE_FNS
+
+        mock_cpu = _MONITOR_VALUE_FNS["cpu-usage"]
+        mock_cpu.return_value = (12.341, None)
+        first = client.get("/api/monitor/value?mode=cpu-usage")
+        assert first.headers["ETag"] == 'W/"cpu-usage:12.34"'
+
+        mock_cpu.return_value = (12.339, None)
+        second = client.get(
+            "/api/monitor/value?mode=cpu-usage",
+            headers={"If-None-Match": first.headers["ETag"]},
+        )
+        assert second.status_code == 304
+
+        mock_cpu.return_value = (50.0, None)
+        third = client.get(
+            "/api/monitor/value?mode=cpu-usage",
+            headers={"If-None-Match": first.headers["ETag"]},
+        )
+        assert third.status_code == 200
+        assert third.get_json()["value"] == 50.0
+
+
+class TestMonitorConfigPeriodUpdates:
+    """Test api_monitor_config only reconfigures changed periods."""
+
+    @patch("routes.update_monitor_period")
+    def test_unchanged_period_skips_update(self, mock_update, client):
+        """Test posting the current period does not touch the timers."""
+        from state import state
+
+        device = state.get_active_device()
+        device.period_0 = 0.5
+        device.period_1 = 1.0
+        client.post(
+            "/api/monitor/config",
+            data=json.dumps({"period_0": 0.5, "period_1": 2.0}),
+            content_type="application/json",
+        )
+        mock_update.assert_called_once_with(device, 2.0, channel=1)
+        assert device.period == 0.5
+
+
+class TestLogStreaming:
+    """Test large log backlogs are streamed."""
+
+    def test_large_log_streamed(self, client):
+        """Test a backlog above the threshold is streamed as valid JSON."""
+        from routes import LOG_STREAM_THRESHOLD
+        from state import state
+
+        device = state.get_active_device()
+        saved_log, saved_next = device.serial_log, device.log_next_id
+        count = LOG_STREAM_THRESHOLD + 100
+        device.serial_log = [
+            {"id": i, "time": "00:00:00.000", "dir": "RX", "data": f"行{i}"}
+            for i in range(count)
+        ]
+        device.log_next_id = count
+        try:
+            response = client.get("/api/log")
+            assert response.is_streamed
+            data = json.loads(response.get_data(as_text=True))
+            assert data["success"] is True
+            assert data["next_index"] == count
+            assert [e["id"] for e in data["logs"]] == list(range(count))
+            assert data["logs"][7]["data"] == "行7"
+        finally:
+            device.serial_log, device.log_next_id = saved_log, saved_next
+
+
+class TestConfigFieldTable:
+    """Test table-driven api_config updates."""
+
+    def test_fields_converted(self, client):
+        """Test values are converted per field and unknown keys ignored."""
+        from state import state
+
+        device = state.get_active_device()
+        response = client.post(
+            "/api/config",
+            data=json.dumps(
+                {
+                    "motor_max": "2000",
+                    "threshold_value": "75.5",
+                    "cmd_file": "",
+                    "write_period": -1,
+                    "audio_channel": "bogus",
+                    "name": "ignored",
+                }
+            ),
+            content_type="application/json",
+        )
+        assert response.get_json()["success"] is True
+        assert device.motor_max == 2000
+        assert device.threshold_value == 75.5
+        assert device.cmd_file is None
+        assert device.write_period == 0.0
+        assert device.audio_channel in ("mix", "left", "right")
+        assert device.name != "ignored"
+
+    @patch("routes.update_monitor_period")
+    def test_unchanged_values_skip_save(self, mock_update, client):
+        """Test re-submitting current values does not schedule a save."""
+        from state import state
+
+        device = state.get_active_device()
+        payload = {
+            "motor_max": device.motor_max,
+            "period": device.period,
+            "audio_channel": device.audio_channel,
+            "auto_sync_clock": device.auto_sync_clock,
+        }
+        with patch.object(state, "mark_dirty") as mock_dirty:
+            client.post(
+                "/api/config",
+                data=json.dumps(payload),
+                content_type="application/json",
+            )
+            mock_dirty.assert_not_called()
+            mock_update.assert_not_called()
+
+            payload["period"] = device.period + 0.5
+            client.post(
+                "/api/config",
+                data=json.dumps(payload),
+                content_type="application/json",
+            )
+            mock_dirty.assert_called_once()
+            mock_update.assert_called_once_with(device, payload["period"])
+
+
+class TestConnectClockSync:
+    """Test clock sync performed inside the connect worker call."""
+
+    @patch("routes.serial_write_logged", return_value=True)
+    @patch("routes.serial_open")
+    def test_connect_syncs_clock(self, mock_open, mock_write_direct, client):
+        """Test connect syncs the clock when auto sync is due."""
+        from serial_utils import stop_device_worker
+        from state import state
+
+        device = state.get_active_device()
+        mock_ser = MagicMock()
+        mock_ser.isOpen.return_value = True
+        mock_open.return_value = (mock_ser, None)
+        device.auto_sync_clock = True
+        device.last_sync_time = None
+        try:
+            data = client.post(
+                "/api/connect",
+                data=json.dumps({"port": "/dev/ttyFAKE"}),
+                content_type="application/json",
+            ).get_json()
+            assert data["success"] is True
+            assert data["clock_synced"] is True
+            assert data["last_sync_time"] is not None
+            cmd = mock_write_direct.call_args[0][1]
+            assert cmd.startswith("clock -c SET")
+        finally:
+            stop_device_worker(device)
+            device.ser = None
+            device.auto_sync_clock = False
+            device.auto_connect = False
+
+    @patch("routes.serial_write_logged", return_value=False)
+    @patch("routes.serial_open")
+    def test_connect_failed_sync_not_reported(
+        self, mock_open, mock_write_direct, client
+    ):
+        """Test a failed sync write on connect is not reported as synced."""
+        from serial_utils import stop_device_worker
+        from state import state
+
+        device = state.get_active_device()
+        mock_ser = MagicMock()
+        mock_ser.isOpen.return_value = True
+        mock_open.return_value = (mock_ser, None)
+        device.auto_sync_clock = True
+        device.last_sync_time = None
+        try:
+            data = client.post(
+                "/api/connect",
+                data=json.dumps({"port": "/dev/ttyFAKE"}),
+                content_type="application/json",
+            ).get_json()
+            assert data["success"] is True
+            assert data["clock_synced"] is False
+            assert device.last_sync_time is None
+            mock_write_direct.assert_called_once()
+        finally:
+            stop_device_worker(device)
+            device.ser = None
+            device.auto_sync_clock = False
+            device.auto_connect = False
@@ -53,7 +53,7 @@ class TestSerialQueue:
             callback_count[0] += 1
 
         timer = tm.add(0.02, test_callback, "test")
-        timer.reset(time.time())
+        timer.reset(time.monotonic())
         worker.wake()
         time.sleep(0.3)
 
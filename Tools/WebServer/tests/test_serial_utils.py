@@ -25,8 +25,8 @@ class TestScanSerialPorts:
             assert "description" in port
 
     @patch("serial_utils.serial.tools.list_ports.comports")
-    @patch("serial_utils.glob.glob")
-    def test_scan_serial_ports_filters_ttys(self, mock_glob, mock_comports):
+    @patch("serial_utils._scan_ch341_devices")
+    def test_scan_serial_ports_filters_ttys(self, mock_ch341, mock_comports):
         """Test /dev/ttyS* devices are filtered from scan result."""
         from serial_utils import scan_serial_ports
 
@@ -36,7 +36,7 @@ class TestScanSerialPorts:
             MagicMock(device="/dev/ttyACM0", description="CDC ACM"),
             MagicMock(device="/dev/ttyS3", description="Legacy UART"),
         ]
-        mock_glob.return_value = ["/dev/ttyCH341USB0"]
+        mock_ch341.return_value = ["/dev/ttyCH341USB0"]
 
         ports = scan_serial_ports()
         devices = [port["device"] for port in ports]
@@ -47,6 +47,28 @@ class TestScanSerialPorts:
         assert "/dev/ttyS0" not in devices
         assert "/dev/ttyS3" not in devices
 
+    @patch("serial_utils.os.scandir")
+    def test_scan_ch341_devices(self, mock_scandir):
+        """Test CH341 nodes are picked out of /dev by name prefix."""
+        from serial_utils import _scan_ch341_devices
+
+        entries = []
+        for name in ("ttyCH341USB0", "ttyUSB0", "ttyCH341USB1", "null"):
+            entry = MagicMock()
+            entry.name = name
+            entries.append(entry)
+        mock_scandir.return_value.__enter__.return_value = entries
+
+        assert _scan_ch341_devices() == ["/dev/ttyCH341USB0", "/dev/ttyCH341USB1"]
+        mock_scandir.assert_called_once_with("/dev")
+
+    @patch("serial_utils.os.scandir", side_effect=FileNotFoundError)
+    def test_scan_ch341_devices_no_dev(self, mock_scandir):
+        """Test a missing /dev yields no CH341 devices."""
+        from serial_utils import _scan_ch341_devices
+
+        assert _scan_ch341_devices() == []
+
 
 class TestSerialOpen:
     """Test serial_open function."""
@@ -159,6 +181,65 @@ class TestSerialWrite:
         assert error is None
 
 
+class TestScanSerialPortsCached:
+    """Test the TTL cache around scan_serial_ports."""
+
+    @patch("serial_utils.time.monotonic")
+    @patch("serial_utils.scan_serial_ports")
+    def test_scan_reused_within_ttl(self, mock_scan, mock_time):
+        """Test port scans are reused for PORT_SCAN_TTL seconds."""
+        from serial_utils import (
+            PORT_SCAN_TTL,
+            invalidate_port_scan,
+            scan_serial_ports_cached,
+        )
+
+        invalidate_port_scan()
+        mock_scan.return_value = [{"device": "/dev/ttyUSB0", "description": "A"}]
+        mock_time.return_value = 100.0
+        scan_serial_ports_cached()
+        mock_time.return_value = 100.0 + PORT_SCAN_TTL / 2
+        ports = scan_serial_ports_cached()
+        assert mock_scan.call_count == 1
+        assert ports[0]["device"] == "/dev/ttyUSB0"
+
+        mock_time.return_value = 100.0 + PORT_SCAN_TTL + 0.1
+        scan_serial_ports_cached()
+        assert mock_scan.call_count == 2
+
+        # A hotplug event forces the next call to rescan
+        invalidate_port_scan()
+        scan_serial_ports_cached()
+        assert mock_scan.call_count == 3
+        invalidate_port_scan()
+
+    def test_hotplug_monitor_without_pyudev(self):
+        """Test the hotplug monitor is skipped when pyudev is missing."""
+        import serial_utils
+
+        with patch.object(serial_utils, "pyudev", None), patch.object(
+            serial_utils, "_hotplug_observer", None
+        ):
+            assert serial_utils.start_port_hotplug_monitor() is False
+
+    def test_hotplug_monitor_invalidates_cache(self):
+        """Test tty events from pyudev invalidate the scan cache."""
+        import serial_utils
+
+        fake_pyudev = MagicMock()
+        with patch.object(serial_utils, "pyudev", fake_pyudev), patch.object(
+            serial_utils, "_hotplug_observer", None
+        ):
+            assert serial_utils.start_port_hotplug_monitor() is True
+            monitor = fake_pyudev.Monitor.from_netlink.return_value
+            monitor.filter_by.assert_called_once_with(subsystem="tty")
+            callback = fake_pyudev.MonitorObserver.call_args[1]["callback"]
+
+            serial_utils._port_scan_cache = (1.0, ["stale"])
+            callback(MagicMock())
+            assert serial_utils._port_scan_cache == (None, None)
+
+
 class TestSerialWriteAsync:
     """Test serial_write_async function."""
 
@@ -182,7 +263,33 @@ class TestSerialWriteAsync:
         device.worker = MagicMock()
 
         serial_write_async(device, "test")
-        device.worker.enqueue.assert_called_once_with("write", "test")
+        device.worker.enqueue.assert_called_once_with("write", ("test", b"test"))
+
+
+class TestSerialWriteLatest:
+    """Test serial_write_latest function."""
+
+    def test_serial_write_latest_no_worker(self):
+        """Test serial_write_latest when no worker."""
+        from serial_utils import serial_write_latest
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        device.worker = None
+
+        # Should not raise any exception
+        serial_write_latest(device, "key", "test")
+
+    def test_serial_write_latest_with_worker(self):
+        """Test serial_write_latest with worker."""
+        from serial_utils import serial_write_latest
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        device.worker = MagicMock()
+
+        serial_write_latest(device, "key", "test")
+        device.worker.enqueue_latest.assert_called_once_with("key", ("test", b"test"))
 
 
 class TestSerialWriteDirect:
@@ -200,17 +307,18 @@ class TestSerialWriteDirect:
         serial_write_direct(device, "test")
 
     def test_serial_write_direct_not_open(self):
-        """Test serial_write_direct when serial not open."""
+        """Test serial_write_direct when the port was closed underneath."""
+        import serial
         from serial_utils import serial_write_direct
         from state import DeviceState
 
         device = DeviceState("test", "Test")
         device.ser = MagicMock()
-        device.ser.isOpen.return_value = False
+        device.ser.write.side_effect = serial.PortNotOpenError()
 
         # Should not raise any exception
         serial_write_direct(device, "test")
-        device.ser.write.assert_not_called()
+        device.ser.isOpen.assert_not_called()
 
     def test_serial_write_direct_success(self):
         """Test successful serial_write_direct."""
@@ -224,7 +332,7 @@ class TestSerialWriteDirect:
         serial_write_direct(device, "test\r\n")
 
         device.ser.write.assert_called_once_with(b"test\r\n")
-        device.ser.flush.assert_called_once()
+        device.ser.flush.assert_not_called()
 
     def test_serial_write_direct_exception(self):
         """Test serial_write_direct with exception."""
@@ -240,6 +348,50 @@ class TestSerialWriteDirect:
         serial_write_direct(device, "test")
 
 
+class TestSerialWriteLogged:
+    """Test serial_write_logged function."""
+
+    def test_serial_write_logged_no_worker(self):
+        """Test serial_write_logged reports failure without a worker."""
+        from serial_utils import serial_write_logged
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        device.ser = MagicMock()
+        device.worker = None
+
+        assert serial_write_logged(device, "test") is False
+        device.ser.write.assert_not_called()
+
+    def test_serial_write_logged_logs_tx(self):
+        """Test serial_write_logged writes through the worker and logs TX."""
+        from device_worker import DeviceWorker
+        from serial_utils import serial_write_logged
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        device.ser = MagicMock()
+        device.worker = DeviceWorker(device)
+
+        assert serial_write_logged(device, "test\r\n") is True
+        device.ser.write.assert_called_once_with(b"test\r\n")
+        assert device.serial_log[-1]["dir"] == "TX"
+
+    def test_serial_write_logged_write_error(self):
+        """Test serial_write_logged reports a failed write."""
+        from device_worker import DeviceWorker
+        from serial_utils import serial_write_logged
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        device.ser = MagicMock()
+        device.ser.write.side_effect = Exception("Write error")
+        device.worker = DeviceWorker(device)
+
+        assert serial_write_logged(device, "test") is False
+        assert len(device.serial_log) == 0
+
+
 class TestDeviceWorkerFunctions:
     """Test device worker helper functions."""
 
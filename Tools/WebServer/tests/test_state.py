@@ -7,8 +7,11 @@
 State module tests (clock sync logic, device state).
 """
 
+import time
 from datetime import datetime, timedelta
 
+import pytest
+
 
 class TestClockSyncLogic:
     """Test clock sync timer logic."""
@@ -134,6 +137,24 @@ class TestDeviceStateDefaults:
         assert "motor_unit_0" in DEVICE_PERSISTENT_KEYS
         assert "motor_unit_1" in DEVICE_PERSISTENT_KEYS
 
+    def test_slots_cover_init(self):
+        """Test every slot is initialized and no instance dict exists."""
+        import pytest
+        from state import DeviceState
+
+        device = DeviceState("test", "Test")
+        for name in DeviceState.__slots__:
+            getattr(device, name)
+        assert not hasattr(device, "__dict__")
+        with pytest.raises(AttributeError):
+            device.not_a_field = 1
+
+    def test_persistent_keys_are_slots(self):
+        """Test every persisted key is a declared attribute."""
+        from state import DeviceState, DEVICE_PERSISTENT_KEYS
+
+        assert set(DEVICE_PERSISTENT_KEYS) <= set(DeviceState.__slots__)
+
 
 class TestDeviceStateToFromDict:
     """Test DeviceState to_dict and from_dict methods."""
@@ -154,9 +175,8 @@ class TestDeviceStateToFromDict:
         assert data["motor_min"] == 100
         assert data["motor_max"] == 900
         assert data["port"] == "/dev/ttyUSB0"
-        # All persistent keys should be present
-        for key in DEVICE_PERSISTENT_KEYS:
-            assert key in data
+        # All persistent keys should be present, in declaration order
+        assert list(data) == DEVICE_PERSISTENT_KEYS
 
     def test_from_dict(self):
         """Test from_dict imports config."""
@@ -192,6 +212,16 @@ class TestDeviceStateToFromDict:
         assert device.motor_min == 50
         assert device.motor_max == original_motor_max  # Unchanged
 
+    def test_from_dict_ignores_unknown_keys(self):
+        """Test from_dict skips keys that are not persistent settings."""
+        from state import DeviceState
+
+        device = DeviceState("test_id", "Test Device")
+        device.from_dict({"motor_min": 5, "monitor_running": True, "bogus": 1})
+
+        assert device.motor_min == 5
+        assert device.monitor_running is False
+
 
 class TestMultiDeviceState:
     """Test MultiDeviceState class."""
@@ -383,22 +413,25 @@ class TestMultiDeviceState:
         connected_device = next(d for d in devices if d["id"] == device_id)
         assert connected_device["connected"] is True
 
-    def test_list_devices_serial_exception(self):
-        """Test listing devices when serial raises exception."""
+    def test_list_devices_does_not_probe_port(self):
+        """Test listing devices reads the connection state without isOpen()."""
         from state import MultiDeviceState
         from unittest.mock import MagicMock
 
         mds = MultiDeviceState()
-        device_id = mds.add_device(name="Bad Serial")
+        device_id = mds.add_device(name="Probe Test")
         device = mds.get_device(device_id)
         mock_serial = MagicMock()
-        mock_serial.isOpen.side_effect = Exception("Serial error")
         device.ser = mock_serial
 
-        # Should not raise
         devices = mds.list_devices()
-        bad_device = next(d for d in devices if d["id"] == device_id)
-        assert bad_device["connected"] is False
+        listed = next(d for d in devices if d["id"] == device_id)
+        assert listed["connected"] is True
+        mock_serial.isOpen.assert_not_called()
+
+        device.ser = None
+        listed = next(d for d in mds.list_devices() if d["id"] == device_id)
+        assert listed["connected"] is False
 
     def test_save_config(self):
         """Test saving config."""
@@ -432,3 +465,177 @@ class TestMultiDeviceState:
             state.CONFIG_FILE = original_config_file
             if os.path.exists(temp_path):
                 os.remove(temp_path)
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_save_load_round_trip(self, use_orjson, tmp_path):
+        """Test config round-trips with or without orjson, in the same layout."""
+        import json
+        import state
+        from unittest.mock import patch
+        from state import MultiDeviceState
+
+        if use_orjson and state.orjson is None:
+            pytest.skip("orjson not installed")
+        config_file = str(tmp_path / "config.json")
+        with patch("state.CONFIG_FILE", config_file), patch.object(
+            state, "orjson", state.orjson if use_orjson else None
+        ):
+            mds = MultiDeviceState()
+            device = mds.get_device(mds.add_device(name="设备2"))
+            device.threshold_value = 72.5
+            mds.save_config()
+
+            with open(config_file, encoding="utf-8") as f:
+                text = f.read()
+            assert "设备2" in text
+            expected = json.dumps(json.loads(text), indent=2, ensure_ascii=False)
+            assert text == expected + "\n"
+
+            loaded = MultiDeviceState()
+            assert loaded.get_device(device.device_id).name == "设备2"
+            assert loaded.get_device(device.device_id).threshold_value == 72.5
+
+    def test_load_v1_config_migrates(self, tmp_path):
+        """Test a v1 single-device config is migrated to v2."""
+        import json
+        from unittest.mock import patch
+        from state import CONFIG_VERSION, MultiDeviceState
+
+        config_file = tmp_path / "config.json"
+        config_file.write_text(
+            json.dumps(
+                {"port": "/dev/ttyUSB3", "motor_max": 750, "monitor_running": True}
+            ),
+            encoding="utf-8",
+        )
+        with patch("state.CONFIG_FILE", str(config_file)):
+            mds = MultiDeviceState()
+
+        device = mds.get_device("device_0")
+        assert device.port == "/dev/ttyUSB3"
+        assert device.motor_max == 750
+        assert device.monitor_running is False  # Not a v1 config key
+        assert json.loads(config_file.read_text())["version"] == CONFIG_VERSION
+
+    def test_save_config_skips_unchanged(self, tmp_path):
+        """Test saving identical config does not rewrite the file."""
+        import os
+        from unittest.mock import patch
+        from state import MultiDeviceState
+
+        config_file = str(tmp_path / "config.json")
+        with patch("state.CONFIG_FILE", config_file):
+            mds = MultiDeviceState()
+            with patch("state.os.replace", wraps=os.replace) as mock_replace:
+                mds.save_config()
+                mds.save_config()
+                assert mock_replace.call_count == 1
+
+                # Reloading the same file: still nothing new to write
+                reloaded = MultiDeviceState()
+                reloaded.save_config()
+                assert mock_replace.call_count == 1
+
+                mds.get_active_device().motor_max = 500
+                mds.save_config()
+                assert mock_replace.call_count == 2
+
+    def test_save_config_is_atomic(self, tmp_path):
+        """Test a failed save leaves the previous config file intact."""
+        import os
+        from unittest.mock import patch
+        from state import MultiDeviceState
+
+        config_file = str(tmp_path / "config.json")
+        with patch("state.CONFIG_FILE", config_file):
+            mds = MultiDeviceState()
+            mds.save_config()
+            assert os.listdir(tmp_path) == ["config.json"]
+            with open(config_file, "rb") as f:
+                saved = f.read()
+
+            mds.add_device(name="Not Saved")
+            with patch("state.os.fsync", side_effect=OSError("disk full")):
+                mds.save_config()  # Logged, not raised
+            with open(config_file, "rb") as f:
+                assert f.read() == saved
+
+    def test_concurrent_saves_do_not_collide(self, tmp_path):
+        """Test overlapping saves never lose a write or the temp file."""
+        import threading
+        from unittest.mock import patch
+        from state import MultiDeviceState
+
+        config_file = str(tmp_path / "config.json")
+        with patch("state.CONFIG_FILE", config_file):
+            mds = MultiDeviceState()
+            device = mds.get_active_device()
+
+            def saver(offset):
+                for i in range(50):
+                    device.motor_max = offset + i
+                    mds.save_config()
+
+            with patch("state.logger") as mock_logger:
+                threads = [
+                    threading.Thread(target=saver, args=(n * 100,)) for n in range(4)
+                ]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+                mock_logger.exception.assert_not_called()
+
+            # The file holds what _saved_config says was written
+            with open(config_file, "rb") as f:
+                assert f.read() == mds._saved_config
+
+
+class TestDebouncedSave:
+    """Test debounced config saving."""
+
+    def test_mark_dirty_coalesces_saves(self):
+        """Test repeated mark_dirty calls result in a single save."""
+        from unittest.mock import patch
+        from state import MultiDeviceState
+
+        mds = MultiDeviceState()
+        with patch.object(mds, "save_config") as mock_save, patch(
+            "state.SAVE_DEBOUNCE_DELAY", 0.05
+        ):
+            for _ in range(10):
+                mds.mark_dirty()
+            mock_save.assert_not_called()
+            time.sleep(0.2)
+            mock_save.assert_called_once()
+
+    def test_flush_config(self):
+        """Test flush_config writes pending changes immediately, once."""
+        from unittest.mock import patch
+        from state import MultiDeviceState
+
+        mds = MultiDeviceState()
+        with patch.object(mds, "save_config") as mock_save:
+            mds.flush_config()
+            mock_save.assert_not_called()
+
+            mds.mark_dirty()
+            mds.flush_config()
+            mock_save.assert_called_once()
+
+    def test_single_writer_thread(self):
+        """Test successive bursts reuse one writer thread."""
+        from unittest.mock import patch
+        from state import MultiDeviceState
+
+        mds = MultiDeviceState()
+        with patch.object(mds, "save_config") as mock_save, patch(
+            "state.SAVE_DEBOUNCE_DELAY", 0.02
+        ):
+            mds.mark_dirty()
+            writer = mds._save_thread
+            time.sleep(0.1)
+            mds.mark_dirty()
+            time.sleep(0.1)
+            assert mds._save_thread is writer
+            assert mock_save.call_count == 2
@@ -8,6 +8,7 @@ Timer module tests.
 """
 
 import time
+from unittest.mock import patch
 
 
 class TestTimer:
@@ -57,6 +58,25 @@ class TestTimer:
         timer.check(now + 0.15)  # Should fire
         assert counter[0] == 1
 
+    def test_timer_ignores_wall_clock_changes(self):
+        """Test default times come from the monotonic clock."""
+        from timer import TimerManager
+
+        counter = [0]
+
+        def increment():
+            counter[0] += 1
+
+        tm = TimerManager()
+        timer = tm.add(10, increment, "test_timer")
+        with patch("timer.time.monotonic", return_value=100.0), patch(
+            "timer.time.time", return_value=1e12
+        ):
+            timer.reset()
+            assert tm.next_wake_time() == 10
+            tm.tick()
+        assert counter[0] == 0
+
 
 class TestTimerManager:
     """Test TimerManager class."""
@@ -139,3 +159,19 @@ class TestTimerManager:
 
         tm.clear()
         assert len(tm.timers) == 0
+
+    def test_timer_remove_by_name(self):
+        """Test removing a timer by name."""
+        from timer import TimerManager
+
+        tm = TimerManager()
+        tm.add(0.05, lambda: None, "fast")
+        slow = tm.add(0.1, lambda: None, "slow")
+
+        assert tm.remove_by_name("fast") is True
+        assert tm.timers == [slow]
+        assert tm.remove_by_name("fast") is False
+
+        tm.remove(slow)
+        assert tm.remove_by_name("slow") is False
+        assert tm.timers == []
@@ -8,6 +8,9 @@ Timer module for DutyCycle Web Server.
 
 Provides lightweight cooperative timers for scheduling tasks
 in a single-threaded event loop.
+
+Times are time.monotonic() seconds, so wall-clock changes (NTP, manual
+clock setting) neither fire timers early nor stall them.
 """
 
 import time
@@ -36,7 +39,7 @@ class Timer:
         Check if timer should fire and execute callback if so.
 
         Args:
-            now: Current time (time.time())
+            now: Current time (time.monotonic())
 
         Returns:
             True if callback was executed, False otherwise
@@ -50,7 +53,7 @@ class Timer:
     def reset(self, now=None):
         """Reset timer to fire after interval from now."""
         if now is None:
-            now = time.time()
+            now = time.monotonic()
         self.next_run = now + self.interval
 
     def time_until_next(self, now):
@@ -69,34 +72,52 @@ class TimerManager:
 
     def __init__(self):
         self.timers = []
+        self._by_name = {}  # name -> most recently added timer
 
     def add(self, interval, callback, name=None):
         """Add a new timer and return it."""
         timer = Timer(interval, callback, name)
         self.timers.append(timer)
+        self._by_name[timer.name] = timer
         return timer
 
     def remove(self, timer):
         """Remove a timer."""
         if timer in self.timers:
             self.timers.remove(timer)
+        if self._by_name.get(timer.name) is timer:
+            del self._by_name[timer.name]
+
+    def remove_by_name(self, name):
+        """
+        Remove the timer registered under a name.
+
+        Returns:
+            True if a timer was removed, False otherwise
+        """
+        timer = self._by_name.pop(name, None)
+        if timer is None:
+            return False
+        self.timers.remove(timer)
+        return True
 
     def clear(self):
         """Remove all timers."""
         self.timers.clear()
+        self._by_name.clear()
 
     def tick(self, now=None):
         """
         Process all timers.
 
         Args:
-            now: Current time, or None to use time.time()
+            now: Current time, or None to use time.monotonic()
 
         Returns:
             Number of timers that fired
         """
         if now is None:
-            now = time.time()
+            now = time.monotonic()
 
         fired = 0
         for timer in self.timers:
@@ -109,7 +130,7 @@ class TimerManager:
         Calculate the minimum sleep time until next timer fires.
 
         Args:
-            now: Current time, or None to use time.time()
+            now: Current time, or None to use time.monotonic()
 
         Returns:
             Seconds until next timer, or None if no timers
@@ -118,7 +139,7 @@ class TimerManager:
             return None
 
         if now is None:
-            now = time.time()
+            now = time.monotonic()
 
         min_wait = float("inf")
         for timer in self.timers: